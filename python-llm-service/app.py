@@ -2,19 +2,12 @@ from flask import Flask, request, jsonify
 import os
 from dotenv import load_dotenv
 from src.agents.langchain_agent import LangChainAgent
-import asyncio
-from functools import wraps
+from src.core.async_utils import async_route
 
 load_dotenv()
 
 app = Flask(__name__)
 
-def async_route(f):
-    @wraps(f)
-    def wrapped(*args, **kwargs):
-        return asyncio.run(f(*args, **kwargs))
-    return wrapped
-
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "ok"})
@@ -0,0 +1,79 @@
+"""Measure affect scoring throughput for EmotionalMemory.
+
+Run from the python-llm-service directory:
+
+    python -m benchmarks.bench_affect_lexicon [--messages N] [--lexicon-words N]
+
+"sets" is the original per-message set-intersection update over the six
+built-in word lists; "per-message" scores each message through the NumPy
+lexicon; "batch" replays every message with one ``scoreMany`` call. The
+last run uses a large synthetic lexicon memory-mapped from disk.
+"""
+import argparse
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from src.agents.affect_lexicon import DEFAULT_WORDS, AffectLexicon
+from src.agents.memory import EmotionalMemory
+
+
+def sets_update(texts):
+    groups = {key: frozenset(words) for key, words in DEFAULT_WORDS.items()}
+    valence = arousal = dominance = 0.0
+    alpha = 0.3
+    for text in texts:
+        words = set(text.split())
+        hits = {key: len(words & group) for key, group in groups.items()}
+        valence_impact = (hits[(0, 0.2)] - hits[(0, -0.2)]) * 0.2
+        arousal_impact = (hits[(1, 0.2)] - hits[(1, -0.2)]) * 0.2
+        dominance_impact = (hits[(2, 0.2)] - hits[(2, -0.2)]) * 0.2
+        valence = max(-1.0, min(1.0, (1 - alpha) * valence + alpha * valence_impact))
+        arousal = max(-1.0, min(1.0, (1 - alpha) * arousal + alpha * arousal_impact))
+        dominance = max(-1.0, min(1.0, (1 - alpha) * dominance + alpha * dominance_impact))
+    return valence, arousal, dominance
+
+
+def timed(label: str, n: int, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:>28}: {elapsed:7.3f} s ({n / elapsed:,.0f} messages/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--lexicon-words", type=int, default=50000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    builtin = sorted({word for group in DEFAULT_WORDS.values() for word in group})
+    filler = [f"word{i}" for i in range(2000)]
+    texts = [" ".join(rng.choices(builtin + filler, k=20)) for _ in range(args.messages)]
+
+    timed("sets", args.messages, lambda: sets_update(texts))
+
+    def per_message():
+        memory = EmotionalMemory(lexicon=AffectLexicon.default())
+        for text in texts:
+            memory.updateEmotionalState(text)
+
+    timed("per-message", args.messages, per_message)
+    timed("batch", args.messages,
+          lambda: EmotionalMemory(lexicon=AffectLexicon.default()).updateEmotionalStates(texts))
+
+    # A lexicon of realistic size, saved and memory-mapped like a deployed one
+    words = builtin + filler + [f"lex{i}" for i in range(args.lexicon_words)]
+    weights = np.random.default_rng(0).uniform(-0.2, 0.2, (len(words), 3)).astype(np.float32)
+    with tempfile.TemporaryDirectory() as path:
+        AffectLexicon({word: row for row, word in enumerate(words)}, weights).save(path)
+        lexicon = AffectLexicon.load(path)
+        timed(f"batch, {len(words):,}-word mmap", args.messages,
+              lambda: EmotionalMemory(lexicon=lexicon).updateEmotionalStates(texts))
+
+
+if __name__ == "__main__":
+    main()
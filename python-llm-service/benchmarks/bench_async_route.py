@@ -0,0 +1,66 @@
+"""Measure the per-request overhead of ``async_route`` in both loop modes.
+
+Run from the python-llm-service directory:
+
+    python -m benchmarks.bench_async_route [--requests N]
+
+"per-request" is the old behaviour (``asyncio.run`` for every request);
+"persistent" submits to the long-lived loop thread.
+"""
+import argparse
+import asyncio
+import time
+
+from flask import Flask, jsonify
+
+from src.core import async_utils
+from src.core.async_utils import async_route, loop_thread
+
+
+async def noop():
+    await asyncio.sleep(0)
+    return {"status": "ok"}
+
+
+def build_app() -> Flask:
+    app = Flask(__name__)
+
+    @app.route('/run', methods=['POST'])
+    @async_route
+    async def run():
+        return jsonify(await noop())
+
+    return app
+
+
+def time_per_call(fn, n: int) -> float:
+    # Warm up once so one-off costs (thread start, imports) are excluded
+    fn()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    client = build_app().test_client()
+    rows = []
+    for mode in ("per-request", "persistent"):
+        async_utils.ASYNC_LOOP_MODE = mode
+        bare = time_per_call(lambda: async_utils.run_coroutine(noop()), args.requests)
+        flask = time_per_call(lambda: client.post('/run'), args.requests)
+        rows.append((mode, bare, flask))
+
+    print(f"{'mode':<12} {'coroutine (us)':>15} {'flask request (us)':>19}")
+    for mode, bare, flask in rows:
+        print(f"{mode:<12} {bare:>15.1f} {flask:>19.1f}")
+
+    loop_thread.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Measure save/load cost of the Eliza conversation memory with long histories.
+
+Run from the python-llm-service directory:
+
+    python -m benchmarks.bench_memory_window [--messages N] [--turns N]
+
+"retokenize" is a token-buffer window that recounts every buffered message
+on each save, the way token-limited buffer memories usually prune;
+"cached" is ``ConversationMemory`` with per-message counts and a running
+total.
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+
+from langchain.schema import AIMessage, BaseMessage, HumanMessage
+
+from src.agents.memory import ConversationMemory
+from src.utils.tokens import count_tokens, get_encoding
+
+
+class RetokenizingMemory:
+    """Baseline: prune by recounting the whole buffer after every save."""
+
+    def __init__(self, max_token_limit: int):
+        self.max_token_limit = max_token_limit
+        self.messages: List[BaseMessage] = []
+
+    def _total(self) -> int:
+        return sum(count_tokens(m.content) + 4 for m in self.messages)
+
+    async def loadMemoryVariables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return {"chat_history": list(self.messages)}
+
+    async def saveContext(self, inputs: Dict[str, Any], outputs: Dict[str, Any]):
+        self.messages.append(HumanMessage(content=inputs["input"]))
+        self.messages.append(AIMessage(content=outputs["output"]))
+        total = self._total()
+        while total > self.max_token_limit and len(self.messages) > 1:
+            total -= count_tokens(self.messages.pop(0).content) + 4
+
+
+def turn_text(i: int) -> str:
+    return f"Turn {i}: I have been feeling anxious about work and my family lately, maybe it will pass."
+
+
+async def fill(memory, messages: int):
+    for i in range(messages // 2):
+        await memory.saveContext({"input": turn_text(i)}, {"output": turn_text(i)})
+
+
+async def time_turns(memory, turns: int, offset: int) -> float:
+    start = time.perf_counter()
+    for i in range(turns):
+        await memory.loadMemoryVariables({})
+        await memory.saveContext({"input": turn_text(offset + i)}, {"output": turn_text(offset + i)})
+    return (time.perf_counter() - start) / turns
+
+
+async def main_async(messages: int, turns: int):
+    # Large enough that the window holds the whole history before the timed turns
+    limit = messages * 40
+    for name, memory in (
+        ("retokenize", RetokenizingMemory(limit)),
+        ("cached", ConversationMemory(max_token_limit=limit)),
+    ):
+        await fill(memory, messages)
+        per_turn = await time_turns(memory, turns, messages)
+        print(f"{name:>10}: {per_turn * 1e3:8.3f} ms per save+load ({len(memory.messages)} messages held)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+    if get_encoding("gpt-3.5-turbo") is None:
+        print("tiktoken encoding unavailable; using the character estimate")
+    asyncio.run(main_async(args.messages, args.turns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare the agents' shell tool against the old ``subprocess`` path.
+
+Run from the python-llm-service directory:
+
+    python -m benchmarks.bench_native_shell [--calls N]
+
+"subprocess" is the previous ``_safe_shell_command`` (``sh -c`` per call);
+"native" is ``run_command``, which runs the allow-listed commands
+in-process. Both run in a scratch directory with a few files in it.
+"""
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+from src.core.native_shell import run_command
+
+COMMANDS = ["pwd", "echo hello world", "ls", "ls -la", "cat notes.txt"]
+
+
+def subprocess_command(command: str) -> str:
+    result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=5)
+    return result.stdout if result.returncode == 0 else result.stderr
+
+
+def time_per_call(fn, command: str, n: int) -> float:
+    fn(command)
+    start = time.perf_counter()
+    for _ in range(n):
+        fn(command)
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            for i in range(20):
+                with open(f"file{i}.txt", "w") as f:
+                    f.write("x" * 100)
+            with open("notes.txt", "w") as f:
+                f.write("line\n" * 2000)
+
+            print(f"{'command':<20}{'subprocess':>14}{'native':>12}{'speedup':>10}  same output")
+            for command in COMMANDS:
+                old = time_per_call(subprocess_command, command, args.calls)
+                new = time_per_call(run_command, command, args.calls)
+                same = subprocess_command(command) == run_command(command)
+                print(f"{command:<20}{old * 1e6:>12.1f}us{new * 1e6:>10.1f}us{old / new:>9.0f}x  {same}")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Report cold-start time of the service for different ENABLED_AGENTS settings.
+
+Run from the python-llm-service directory:
+
+    python -m benchmarks.bench_startup [--runs N] [--top N] [--json PATH]
+
+Each run imports ``src.main`` in a fresh interpreter and records the wall
+time plus the service's own startup report. ``--top`` lists the slowest
+modules imported directly by ``src.main`` (cumulative, from
+``python -X importtime``) with lazy agents, to see what still loads
+before the first request.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCENARIOS = {
+    "lazy (no ENABLED_AGENTS)": {"ENABLED_AGENTS": ""},
+    "langchain only": {"ENABLED_AGENTS": "langchain"},
+    "babyagi only": {"ENABLED_AGENTS": "babyagi"},
+    "all agents preloaded": {"ENABLED_AGENTS": "zerepy,langchain,babyagi,autogpt"},
+}
+
+PROBE = "import json, src.main as m; print(json.dumps(m.startup_report()))"
+
+
+def run_once(env_overrides):
+    env = dict(os.environ, **env_overrides)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    return wall, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top):
+    env = dict(os.environ, ENABLED_AGENTS="")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.main"],
+                            env=env, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, module = line[len("import time:"):].split("|")
+        # Keep modules imported directly by src.main (one nesting level)
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        if depth != 1:
+            continue
+        rows.append((int(cumulative_us), module.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'scenario':<28}{'process wall':>14}{'app import':>12}")
+    for name, env in SCENARIOS.items():
+        runs = [run_once(env) for _ in range(args.runs)]
+        wall = statistics.median(run[0] for run in runs)
+        report = runs[-1][1]
+        results[name] = {"wall_seconds": round(wall, 4), "report": report}
+        print(f"{name:<28}{wall:>13.3f}s{report['app_import_seconds']:>11.3f}s")
+
+    if args.top:
+        print("\nSlowest imports with lazy agents (cumulative):")
+        slowest = slowest_imports(args.top)
+        for cumulative_us, module in slowest:
+            print(f"  {cumulative_us / 1e6:7.3f}s  {module}")
+        results["slowest_imports"] = [{"module": module, "seconds": us / 1e6} for us, module in slowest]
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""A local stand-in for the OpenAI API, for load tests that must not call the real one.
+
+Run from the python-llm-service directory:
+
+    python -m benchmarks.load.fake_openai [--port 8011] [--latency-ms 300] [--tokens-per-second 50]
+                                          [--completion-tokens 60] [--error-rate 0.0]
+
+Point the service at it with ``OPENAI_API_BASE=http://127.0.0.1:8011/v1``.
+Serves ``/v1/chat/completions`` (plain and streamed), ``/v1/completions``
+and ``/v1/embeddings``. Each completion waits ``latency-ms`` (time to first
+token) and then ``completion-tokens / tokens-per-second``, streamed
+responses pacing their chunks at that rate. ``error-rate`` of requests
+fail with a 500 or 429 before any work. Replies are shaped so every agent
+finishes: the LangChain agent gets a final answer, BabyAGI a short task
+list, everything else filler text.
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+FILLER = ("the service handled this step and recorded a short result for the next one "
+          "so the benchmark exercises realistic response sizes without calling a real model").split()
+
+
+class FakeSettings:
+    def __init__(self, latency_ms: float = 300.0, jitter_ms: float = 50.0, tokens_per_second: float = 50.0,
+                 completion_tokens: int = 60, error_rate: float = 0.0, embedding_dim: int = 1536,
+                 seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.embedding_dim = embedding_dim
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def first_token_delay(self) -> float:
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, self.latency_ms + jitter) / 1000.0
+
+    def token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            self.requests += 1
+            fail = self.random.random() < self.error_rate
+            self.errors += fail
+            return fail
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def reply_for(prompt: str, completion_tokens: int) -> str:
+    """Pick a reply each agent can parse and finish on."""
+    if "action_input" in prompt:
+        # LangChain conversational chat agent: answer directly, no tool calls
+        answer = " ".join(FILLER[i % len(FILLER)] for i in range(max(1, completion_tokens - 12)))
+        return f'```json\n{{"action": "Final Answer", "action_input": "{answer}"}}\n```'
+    if "task prioritization agent" in prompt:
+        tasks = re.findall(r"^.*#\d+.*$", prompt, re.MULTILINE)
+        return "\n".join(tasks) or "#1 Review the results"
+    if "task creation agent" in prompt:
+        return "Summarize the findings so far\nList open questions"
+    return " ".join(FILLER[i % len(FILLER)] for i in range(completion_tokens))
+
+
+def chunk_words(text: str) -> List[str]:
+    words = re.findall(r"\S+\s*|\s+", text)
+    return words or [text]
+
+
+def embedding_for(text: str, dim: int) -> List[float]:
+    # Deterministic per text so repeated inputs embed identically
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    vector = [rng.uniform(-1.0, 1.0) for _ in range(dim)]
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    settings = FakeSettings()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-3.5-turbo", "object": "model"}]})
+        elif self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, {"requests": self.settings.requests, "errors": self.settings.errors})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        body = self._read_json()
+        if self.settings.should_fail():
+            status = self.settings.random.choice((500, 429))
+            self._send_json(status, {"error": {"message": "injected failure", "type": "server_error"}})
+            return
+        path = self.path.rstrip("/")
+        if path.endswith("/embeddings"):
+            self._embeddings(body)
+        elif path.endswith("/chat/completions"):
+            prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+            self._complete(body, prompt, chat=True)
+        elif path.endswith("/completions"):
+            prompt = body.get("prompt", "")
+            prompt = "\n".join(prompt) if isinstance(prompt, list) else str(prompt)
+            self._complete(body, prompt, chat=False)
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def _embeddings(self, body: Dict[str, Any]):
+        inputs = body.get("input", [])
+        inputs = [inputs] if isinstance(inputs, (str, int)) or (inputs and isinstance(inputs[0], int)) else inputs
+        time.sleep(self.settings.first_token_delay() / 4)
+        data = [
+            {"object": "embedding", "index": i, "embedding": embedding_for(str(text), self.settings.embedding_dim)}
+            for i, text in enumerate(inputs)
+        ]
+        tokens = sum(estimate_tokens(str(text)) for text in inputs)
+        self._send_json(200, {"object": "list", "data": data, "model": body.get("model", "text-embedding-ada-002"),
+                              "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+    def _complete(self, body: Dict[str, Any], prompt: str, chat: bool):
+        model = body.get("model", "gpt-3.5-turbo")
+        limit = body.get("max_tokens") or self.settings.completion_tokens
+        text = reply_for(prompt, min(self.settings.completion_tokens, limit))
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        created = int(time.time())
+        kind = "chat.completion" if chat else "text_completion"
+
+        time.sleep(self.settings.first_token_delay())
+        if body.get("stream"):
+            self._stream(text, model, created, kind, chat)
+            return
+
+        time.sleep(completion_tokens * self.settings.token_delay())
+        choice = {"index": 0, "finish_reason": "stop"}
+        if chat:
+            choice["message"] = {"role": "assistant", "content": text}
+        else:
+            choice["text"] = text
+        self._send_json(200, {
+            "id": f"fake-{created}", "object": kind, "created": created, "model": model,
+            "choices": [choice],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        })
+
+    def _stream(self, text: str, model: str, created: int, kind: str, chat: bool):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        delay = self.settings.token_delay()
+        pieces = chunk_words(text)
+        for i, piece in enumerate(pieces):
+            last = i == len(pieces) - 1
+            if chat:
+                choice = {"index": 0, "delta": {"content": piece}, "finish_reason": "stop" if last else None}
+            else:
+                choice = {"index": 0, "text": piece, "finish_reason": "stop" if last else None}
+            chunk = {"id": f"fake-{created}", "object": f"{kind}.chunk", "created": created, "model": model,
+                     "choices": [choice]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(delay * estimate_tokens(piece))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def serve(port: int, settings: FakeSettings, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Start the fake API in a daemon thread and return the server."""
+    handler = type("Handler", (FakeOpenAIHandler,), {"settings": settings})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True).start()
+    return server
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Delay before the first token")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="Uniform +/- jitter on that delay")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Completion token rate; 0 is instant")
+    parser.add_argument("--completion-tokens", type=int, default=60, help="Length of filler completions")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500/429")
+    parser.add_argument("--embedding-dim", type=int, default=1536)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def settings_from_args(args: argparse.Namespace) -> FakeSettings:
+    return FakeSettings(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        embedding_dim=args.embedding_dim,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8011)
+    add_arguments(parser)
+    args = parser.parse_args()
+    server = serve(args.port, settings_from_args(args), args.host)
+    print(f"Fake OpenAI API on http://{args.host}:{args.port}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""Drive /run at rising concurrency against a local fake OpenAI API and report latency, RPS and RSS.
+
+Run from the python-llm-service directory:
+
+    python -m benchmarks.load.run_load [--agents langchain,babyagi,autogpt] [--concurrency 1,4,16]
+                                       [--requests 40] [--output load-results.json]
+                                       [--latency-ms 300] [--tokens-per-second 50] [--error-rate 0.0]
+
+Starts ``benchmarks.load.fake_openai`` in-process and the service
+(``python -m src.main``) as a subprocess pointed at it, then for every
+agent type and concurrency level sends ``--requests`` requests from that
+many client threads. Each level reports p50/p95/p99 latency, requests per
+second, error count and the service's peak RSS, and the whole run is
+written as JSON to ``--output`` so runs can be diffed. ``--env KEY=VALUE``
+passes settings such as ``ASYNC_LOOP_MODE=per-request`` to the service,
+whose output goes to ``--service-log``.
+
+The service's OpenAI embeddings count tokens with tiktoken, which fetches
+the ``cl100k_base`` encoding from the internet on first use. The service
+is pointed at ``--tiktoken-cache`` (``TIKTOKEN_CACHE_DIR``), and the run
+stops before starting anything if the encoding cannot be loaded from it.
+Run once with network access to fill the cache, or copy a cache from a
+machine that has one. A level in which every request fails also stops the
+run rather than being reported as a result.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from benchmarks.load.fake_openai import add_arguments, serve, settings_from_args
+
+# Per-agent request configs; the loops are bounded so a request makes a fixed number of LLM calls
+AGENT_CONFIGS = {
+    "langchain": {"verbose": False},
+    "babyagi": {"max_iterations": 3},
+    "autogpt": {"max_iterations": 2},
+    "zerepy": {},
+}
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process, from /proc (Linux) or ps."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        output = subprocess.run(["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True)
+        return int(output.stdout.strip()) * 1024
+    except (OSError, ValueError):
+        return None
+
+
+class RSSSampler:
+    """Track the peak RSS of a process while a level runs."""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss_bytes(self.pid) or 0)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes(self.pid) or 0)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def post_json(url: str, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    request = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def service_env(port: int, api_base: str, tiktoken_cache: str, extra_env: Dict[str, str]) -> Dict[str, str]:
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        OPENAI_API_BASE=api_base,
+        OPENAI_API_KEY="sk-fake-load-test",
+        TOOL_CACHE_PATH="",
+        LLM_CACHE_PATH="",
+        VECTOR_INDEX_PATH="",
+        TIKTOKEN_CACHE_DIR=tiktoken_cache
+    )
+    env.update(extra_env)
+    return env
+
+
+def check_tiktoken(env: Dict[str, str]):
+    """Load the embeddings' tiktoken encoding the way the service will, or exit explaining why it can't."""
+    try:
+        check = subprocess.run(
+            [sys.executable, "-c", "import tiktoken; tiktoken.encoding_for_model('text-embedding-ada-002')"],
+            cwd=SERVICE_DIR, env=env, capture_output=True, text=True, timeout=120
+        )
+        error = (check.stderr.strip().splitlines() or ["unknown error"])[-1] if check.returncode else None
+    except subprocess.TimeoutExpired:
+        error = "timed out fetching the encoding"
+    if error:
+        sys.exit(
+            f"Cannot load the tiktoken cl100k_base encoding from TIKTOKEN_CACHE_DIR={env['TIKTOKEN_CACHE_DIR']}: "
+            f"{error}\nEvery request that embeds text would fail. Run once with network access to fill "
+            "the cache (or copy one there), or pass --tiktoken-cache."
+        )
+
+
+def start_service(env: Dict[str, str], log_path: str) -> subprocess.Popen:
+    port = env["PORT"]
+    # A file rather than a pipe, which would block the service once its buffer filled
+    with open(log_path, "w") as log:
+        process = subprocess.Popen([sys.executable, "-m", "src.main"], cwd=SERVICE_DIR, env=env,
+                                   stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            with open(log_path) as log:
+                raise RuntimeError(f"Service exited during startup:\n{log.read()[-4000:]}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                return process
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Service did not become healthy within 60s")
+
+
+def run_level(url: str, agent_type: str, concurrency: int, requests: int, timeout: float, pid: int) -> Dict[str, Any]:
+    config = AGENT_CONFIGS.get(agent_type, {})
+    latencies: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def one(i: int):
+        payload = {"agent_type": agent_type, "input": f"Load test objective {i}", "config": config}
+        start = time.perf_counter()
+        try:
+            body = post_json(url, payload, timeout)
+            result = body.get("result")
+            if body.get("status") != "success":
+                failed, message = True, str(body.get("message"))
+            elif isinstance(result, dict) and "error" in result:
+                failed, message = True, str(result["error"])
+            else:
+                failed, message = False, None
+        except urllib.error.HTTPError as e:
+            try:
+                detail = json.loads(e.read()).get("message", "")
+            except ValueError:
+                detail = ""
+            failed, message = True, f"HTTP {e.code} {detail}".strip()
+        except Exception as e:
+            failed, message = True, str(e)
+        elapsed = time.perf_counter() - start
+        with lock:
+            if failed:
+                errors.append(message)
+            else:
+                latencies.append(elapsed)
+
+    with RSSSampler(pid) as rss:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(requests)))
+        wall = time.perf_counter() - start
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 1) if value is not None else None
+
+    return {
+        "agent_type": agent_type,
+        "concurrency": concurrency,
+        "requests": requests,
+        "ok": len(latencies),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:3],
+        "wall_seconds": round(wall, 3),
+        "rps": round(len(latencies) / wall, 2) if wall else None,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "peak_rss_mb": round(rss.peak / 2 ** 20, 1) if rss.peak else None,
+    }
+
+
+def check_level(row: Dict[str, Any]):
+    """Stop the run when nothing in a level succeeded; its numbers would only measure the failure."""
+    if row["requests"] and not row["ok"]:
+        samples = "\n".join(f"    {sample[:300]}" for sample in row["error_samples"])
+        raise RuntimeError(f"All {row['requests']} {row['agent_type']} requests at concurrency "
+                           f"{row['concurrency']} failed:\n{samples}")
+
+
+def parse_env(pairs: List[str]) -> Dict[str, str]:
+    env = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        env[key] = value
+    return env
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--agents", default="langchain,babyagi,autogpt")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated client concurrency levels")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per agent and level")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests per agent first")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request client timeout in seconds")
+    parser.add_argument("--output", default="load-results.json")
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE passed to the service")
+    parser.add_argument("--service-log", default="load-service.log", help="File for the service's output")
+    parser.add_argument("--tiktoken-cache", default=os.path.join(SERVICE_DIR, ".cache", "tiktoken"),
+                        help="TIKTOKEN_CACHE_DIR for the service")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    agents = [name.strip() for name in args.agents.split(",") if name.strip()]
+    levels = [int(level) for level in args.concurrency.split(",")]
+    settings = settings_from_args(args)
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/run"
+    fake_port = free_port()
+    env = service_env(port, f"http://127.0.0.1:{fake_port}/v1", os.path.abspath(args.tiktoken_cache),
+                      parse_env(args.env))
+    check_tiktoken(env)
+
+    fake = serve(fake_port, settings)
+    service = start_service(env, args.service_log)
+    results: List[Dict[str, Any]] = []
+    try:
+        idle_rss = rss_bytes(service.pid)
+        print(f"{'agent':<11}{'conc':>5}{'ok':>6}{'err':>5}{'rps':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'rss MB':>8}")
+        for agent_type in agents:
+            check_level(run_level(url, agent_type, 1, args.warmup, args.timeout, service.pid))
+            for concurrency in levels:
+                row = run_level(url, agent_type, concurrency, args.requests, args.timeout, service.pid)
+                check_level(row)
+                results.append(row)
+                print(f"{agent_type:<11}{concurrency:>5}{row['ok']:>6}{row['errors']:>5}{row['rps'] or 0:>8.2f}"
+                      f"{row['p50_ms'] or 0:>9.1f}{row['p95_ms'] or 0:>9.1f}{row['p99_ms'] or 0:>9.1f}"
+                      f"{row['peak_rss_mb'] or 0:>8.1f}")
+                for sample in row["error_samples"]:
+                    print(f"    error: {sample[:160]}")
+        final_rss = rss_bytes(service.pid)
+    finally:
+        service.terminate()
+        try:
+            service.wait(10)
+        except subprocess.TimeoutExpired:
+            service.kill()
+        fake.shutdown()
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "service_env": parse_env(args.env),
+        "fake_openai": {
+            "latency_ms": settings.latency_ms,
+            "jitter_ms": settings.jitter_ms,
+            "tokens_per_second": settings.tokens_per_second,
+            "completion_tokens": settings.completion_tokens,
+            "error_rate": settings.error_rate,
+            "upstream_requests": settings.requests,
+            "upstream_errors": settings.errors,
+        },
+        "service_rss_mb": {
+            "idle": round(idle_rss / 2 ** 20, 1) if idle_rss else None,
+            "final": round(final_rss / 2 ** 20, 1) if final_rss else None,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
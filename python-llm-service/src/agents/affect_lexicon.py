@@ -0,0 +1,114 @@
+import json
+import os
+from functools import lru_cache
+from itertools import chain, repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Built-in lexicon: the original Eliza word lists, each word moving one
+# dimension by +/-0.2. Columns are (valence, arousal, dominance).
+DEFAULT_WORDS = {
+    (0, 0.2): {'happy', 'good', 'great', 'wonderful', 'excited', 'love'},
+    (0, -0.2): {'sad', 'bad', 'terrible', 'angry', 'hate', 'afraid'},
+    (1, 0.2): {'excited', 'angry', 'passionate', 'energetic', 'anxious'},
+    (1, -0.2): {'peaceful', 'relaxed', 'calm', 'quiet', 'serene'},
+    (2, 0.2): {'must', 'should', 'will', 'definitely', 'always'},
+    (2, -0.2): {'maybe', 'perhaps', 'might', 'sometimes', 'possibly'},
+}
+
+
+class AffectLexicon:
+    """Valence/arousal/dominance weights for words, backed by a NumPy matrix.
+
+    A lexicon on disk is a directory holding ``vocab.json`` (word to row)
+    and ``weights.npy`` (float32, one row of three weights per word). The
+    matrix is memory-mapped read-only, so every session in the process
+    shares the same pages. A text's impact is the sum of the rows of the
+    distinct words it contains.
+    """
+
+    def __init__(self, vocab: Dict[str, int], weights: np.ndarray):
+        if weights.ndim != 2 or weights.shape[1] != 3:
+            raise ValueError("Lexicon weights must have shape (words, 3)")
+        self.vocab = vocab
+        self.weights = weights
+
+    @classmethod
+    def default(cls) -> "AffectLexicon":
+        words = sorted({word for group in DEFAULT_WORDS.values() for word in group})
+        vocab = {word: row for row, word in enumerate(words)}
+        weights = np.zeros((len(words), 3), dtype=np.float32)
+        for (column, weight), group in DEFAULT_WORDS.items():
+            for word in group:
+                weights[vocab[word], column] += weight
+        return cls(vocab, weights)
+
+    @classmethod
+    def load(cls, path: str) -> "AffectLexicon":
+        """Load a lexicon directory, memory-mapping its weights."""
+        with open(os.path.join(path, "vocab.json")) as f:
+            vocab = json.load(f)
+        weights = np.load(os.path.join(path, "weights.npy"), mmap_mode="r")
+        return cls(vocab, weights)
+
+    def save(self, path: str):
+        """Write the lexicon in the directory layout ``load`` reads."""
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "vocab.json"), "w") as f:
+            json.dump(self.vocab, f)
+        np.save(os.path.join(path, "weights.npy"), np.asarray(self.weights, dtype=np.float32))
+
+    def _rows(self, text: str) -> List[int]:
+        vocab = self.vocab
+        return [vocab[word] for word in set(text.lower().split()) if word in vocab]
+
+    def score(self, text: str) -> Tuple[float, float, float]:
+        """Return the (valence, arousal, dominance) impact of one text."""
+        rows = self._rows(text)
+        if not rows:
+            return 0.0, 0.0, 0.0
+        if len(rows) == 1:
+            valence, arousal, dominance = self.weights[rows[0]].tolist()
+        else:
+            valence, arousal, dominance = self.weights[rows].sum(axis=0, dtype=np.float64).tolist()
+        return valence, arousal, dominance
+
+    def scoreMany(self, texts: Sequence[str]) -> np.ndarray:
+        """Return an (n, 3) array of impacts, one row per text.
+
+        Tokenizing and vocabulary lookups run through ``map`` over the whole
+        batch; deduplicating words per text and summing weights happen in
+        NumPy.
+        """
+        tokens = list(map(str.split, map(str.lower, texts)))
+        impacts = np.zeros((len(tokens), 3), dtype=np.float64)
+        if not tokens:
+            return impacts
+
+        lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+        rows = np.fromiter(map(self.vocab.get, chain.from_iterable(tokens), repeat(-1)),
+                           dtype=np.int64, count=int(lengths.sum()))
+        owners = np.repeat(np.arange(len(tokens), dtype=np.int64), lengths)
+        known = rows >= 0
+        if not known.any():
+            return impacts
+
+        # Count each word once per text, matching the set semantics of score().
+        # Rows are packed by the weight matrix height: vocab.json may skip rows.
+        height = self.weights.shape[0]
+        pairs = np.unique(owners[known] * height + rows[known])
+        owners, rows = np.divmod(pairs, height)
+        word_weights = np.asarray(self.weights[rows], dtype=np.float64)
+        for column in range(3):
+            impacts[:, column] = np.bincount(owners, weights=word_weights[:, column], minlength=len(tokens))
+        return impacts
+
+
+@lru_cache(maxsize=None)
+def load_lexicon(path: Optional[str] = None) -> AffectLexicon:
+    """Return the shared lexicon for ``path``, or the built-in one."""
+    path = path or os.getenv("AFFECT_LEXICON_PATH")
+    if not path:
+        return AffectLexicon.default()
+    return AffectLexicon.load(path)
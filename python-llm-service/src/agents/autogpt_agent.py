@@ -1,20 +1,35 @@
 from typing import List, Dict, Any
+import asyncio
 import os
 import json
-import subprocess
 from langchain.tools import Tool
 from langchain.utilities import GoogleSearchAPIWrapper
 from langchain.agents import Tool
-from langchain.tools import ShellTool
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
 from .base_agent import BaseAgent
+from ..core.file_tools import (
+    FILE_TOOL_MAX_READ_BYTES, FILE_TOOL_MAX_WRITE_BYTES, READ_DESCRIPTION, WRITE_DESCRIPTION, FileTools
+)
+from ..core.native_shell import run_command
+from ..core.tool_cache import tool_cache
+from .context_builder import ContextBuilder
 
 class AutoGPTAgent(BaseAgent):
     def __init__(self, config: Dict[str, Any]):
         """Initialize AutoGPT agent with tools and chains."""
         super().__init__(config)
-        self.tools = self._initialize_tools()
+        self.file_tools = FileTools(
+            max_read_bytes=config.get("file_read_max_bytes", FILE_TOOL_MAX_READ_BYTES),
+            max_write_bytes=config.get("file_write_max_bytes", FILE_TOOL_MAX_WRITE_BYTES)
+        )
+        self.tools = self.instrument_tools(self._initialize_tools())
+        self.context = ContextBuilder(
+            self.tools,
+            model_name=self.llm.model_name,
+            history_token_budget=config.get("history_token_budget", 1000),
+            recent_items=config.get("history_recent_items", 3)
+        )
         self.planning_chain = self._create_planning_chain()
         self.execution_chain = self._create_execution_chain()
         self.reflection_chain = self._create_reflection_chain()
@@ -35,7 +50,7 @@ class AutoGPTAgent(BaseAgent):
             tools.append(
                 Tool(
                     name="web_search",
-                    func=search.run,
+                    func=tool_cache.wrap("web_search", search.run),
                     description="Search the web for information"
                 )
             )
@@ -44,25 +59,24 @@ class AutoGPTAgent(BaseAgent):
         tools.append(
             Tool(
                 name="write_file",
-                func=self._safe_write_file,
-                description="Write content to a file safely"
+                func=self.file_tools.write,
+                description=WRITE_DESCRIPTION
             )
         )
         
         tools.append(
             Tool(
                 name="read_file",
-                func=self._safe_read_file,
-                description="Read content from a file safely"
+                func=self.file_tools.read,
+                description=READ_DESCRIPTION
             )
         )
         
         # Shell command tool (with safety checks)
-        shell_tool = ShellTool()
         tools.append(
             Tool(
                 name="shell",
-                func=self._safe_shell_command,
+                func=run_command,
                 description="Execute shell commands safely"
             )
         )
@@ -117,48 +131,94 @@ class AutoGPTAgent(BaseAgent):
         return LLMChain(llm=self.llm, prompt=reflection_prompt)
 
     async def execute(self, user_input: str) -> Dict[str, Any]:
-        """Execute the AutoGPT agent's main loop."""
+        """Execute the AutoGPT agent's main loop.
+
+        Planning never reads past reflections, so with
+        ``config.pipeline_reflection`` set each iteration's reflection runs
+        in the background while the next iteration plans and executes. The
+        reflections are gathered, in order, before returning.
+        """
         # Initialize goals from user input
         self.state["goals"] = self._parse_goals(user_input)
         results = []
+        prompt_tokens = []
+        pipelined = self.config.get("pipeline_reflection", False)
+        pending_reflections = []
         
+        try:
+            await self._run_iterations(results, prompt_tokens, pipelined, pending_reflections)
+            if pending_reflections:
+                self.state["reflections"].extend(await asyncio.gather(*pending_reflections))
+        finally:
+            for reflection in pending_reflections:
+                reflection.cancel()
+        
+        return {
+            "goals": self.state["goals"],
+            "completed_tasks": self.state["completed_tasks"],
+            "reflections": self.state["reflections"],
+            "results": results,
+            "prompt_tokens": prompt_tokens
+        }
+
+    def _prompt_tokens(self, chain: LLMChain, inputs: Dict[str, Any]) -> int:
+        return self.context.count(chain.prompt.format(**inputs))
+
+    async def _run_iterations(self, results: List[str], prompt_tokens: List[Dict[str, int]],
+                              pipelined: bool, pending_reflections: List[asyncio.Future]):
+        """Run plan/execute/reflect iterations until the goals or max_iterations are reached."""
         while len(self.state["completed_tasks"]) < len(self.state["goals"]):
-            # Plan next action
-            planning_result = await self.planning_chain.arun(
-                goals=self.state["goals"],
-                completed_tasks=self.state["completed_tasks"],
-                current_task=self.state["current_task"]
-            )
+            # Plan next action against a token-budgeted view of the history
+            planning_inputs = {
+                "goals": self.state["goals"],
+                "completed_tasks": self.context.history(self.state["completed_tasks"]),
+                "current_task": self.state["current_task"]
+            }
+            planning_result = await self._run_chain(self.planning_chain, **planning_inputs)
+            self.emit("plan", {"iteration": len(results), "plan": planning_result})
             
             # Execute action
-            execution_result = await self.execution_chain.arun(
-                action=planning_result,
-                tools=self.tools,
-                previous_result=results[-1] if results else None
-            )
+            execution_inputs = {
+                "action": planning_result,
+                "tools": self.context.tool_manifest,
+                "previous_result": results[-1] if results else None
+            }
+            execution_result = await self._run_chain(self.execution_chain, **execution_inputs)
+            self.emit("execute", {"iteration": len(results), "result": execution_result})
+            
+            reflection_inputs = {"action": planning_result, "result": execution_result, "goals": self.state["goals"]}
+            prompt_tokens.append({
+                "iteration": len(results),
+                "planning": self._prompt_tokens(self.planning_chain, planning_inputs),
+                "execution": self._prompt_tokens(self.execution_chain, execution_inputs),
+                "reflection": self._prompt_tokens(self.reflection_chain, reflection_inputs)
+            })
             
             # Reflect on results
-            reflection = await self.reflection_chain.arun(
-                action=planning_result,
-                result=execution_result,
-                goals=self.state["goals"]
-            )
+            reflection = self._reflect(planning_result, execution_result, len(results))
+            if pipelined:
+                pending_reflections.append(asyncio.ensure_future(reflection))
+            else:
+                self.state["reflections"].append(await reflection)
             
             # Update state
             self.state["completed_tasks"].append(planning_result)
-            self.state["reflections"].append(reflection)
             results.append(execution_result)
             
             # Break if max iterations reached or all goals completed
             if len(results) >= self.config.get("max_iterations", 5):
                 break
-        
-        return {
-            "goals": self.state["goals"],
-            "completed_tasks": self.state["completed_tasks"],
-            "reflections": self.state["reflections"],
-            "results": results
-        }
+
+    async def _reflect(self, action: str, result: str, iteration: int) -> str:
+        """Evaluate the result of one iteration."""
+        reflection = await self._run_chain(
+            self.reflection_chain,
+            action=action,
+            result=result,
+            goals=self.state["goals"]
+        )
+        self.emit("reflect", {"iteration": iteration, "reflection": reflection})
+        return reflection
 
     def _parse_goals(self, user_input: str) -> List[str]:
         """Parse user input into a list of goals."""
@@ -166,55 +226,17 @@ class AutoGPTAgent(BaseAgent):
         goals = [g.strip() for g in user_input.replace('\n', ';').split(';')]
         return [g for g in goals if g]  # Remove empty goals
 
-    def _safe_write_file(self, args: str) -> str:
-        """Safely write content to a file."""
-        try:
-            path, content = args.split(':', 1)
-            safe_path = os.path.basename(path)  # Only allow writing to current directory
-            with open(safe_path, 'w') as f:
-                f.write(content)
-            return f"Successfully wrote to {safe_path}"
-        except Exception as e:
-            return f"Error writing file: {str(e)}"
-
-    def _safe_read_file(self, path: str) -> str:
-        """Safely read content from a file."""
-        try:
-            safe_path = os.path.basename(path)  # Only allow reading from current directory
-            with open(safe_path, 'r') as f:
-                return f.read()
-        except Exception as e:
-            return f"Error reading file: {str(e)}"
-
-    def _safe_shell_command(self, command: str) -> str:
-        """Safely execute shell commands."""
-        # List of allowed commands
-        allowed_commands = ['ls', 'pwd', 'echo', 'cat']
-        
-        # Parse command to get the base command
-        base_command = command.split()[0]
-        
-        if base_command not in allowed_commands:
-            return f"Command '{base_command}' is not allowed for security reasons"
-            
-        try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=5  # 5 second timeout
-            )
-            return result.stdout if result.returncode == 0 else result.stderr
-        except Exception as e:
-            return f"Error executing command: {str(e)}"
-
-    async def cleanup(self):
-        """Clean up resources used by the AutoGPT agent."""
-        await super().cleanup()  # Call parent cleanup
+    async def reset(self):
+        """Reset the planning state between pooled requests."""
+        await super().reset()
         self.state = {
             "goals": [],
             "current_task": None,
             "completed_tasks": [],
             "reflections": []
-        } 
\ No newline at end of file
+        }
+        self.context.reset()
+
+    async def cleanup(self):
+        """Clean up resources used by the AutoGPT agent."""
+        await super().cleanup()  # Call parent cleanup
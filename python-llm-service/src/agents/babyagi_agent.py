@@ -1,14 +1,15 @@
 from typing import Dict, Any, List
 import os
+import uuid
 from dotenv import load_dotenv
 from langchain import LLMChain, OpenAI, PromptTemplate
-from langchain.embeddings import OpenAIEmbeddings
-from langchain.vectorstores import Chroma
-from langchain.docstore import InMemoryDocstore
 from collections import deque
 import numpy as np
 import asyncio
 from .base_agent import BaseAgent
+from .embeddings import embed_documents
+from ..core.vector_index import IndexNamespace, vector_index
+from .task_scheduler import Task, TaskScheduler, parse_task_line
 
 load_dotenv()
 
@@ -17,22 +18,29 @@ class BabyAGIAgent(BaseAgent):
         """Initialize BabyAGI agent with vector store and task chains."""
         super().__init__(config)
         
-        # Initialize embeddings and vector store
-        self.embeddings = OpenAIEmbeddings()
-        self.vectorstore = Chroma(
-            collection_name="tasks",
-            embedding_function=self.embeddings
-        )
+        # Initialize a private namespace in the shared vector index
+        self.vectorstore = self._create_vectorstore()
         
         # Initialize task chains
         self.task_creation_chain = self._create_task_creation_chain()
         self.task_prioritization_chain = self._create_task_prioritization_chain()
         self.execution_chain = self._create_execution_chain()
         
-        # Initialize task lists
-        self.task_list = []
+        # Initialize task state
+        self.scheduler = TaskScheduler()
         self.completed_tasks = []
-        self.task_id_counter = 0
+
+    def _create_vectorstore(self) -> IndexNamespace:
+        """Create a fresh namespace for this request's task results."""
+        return IndexNamespace(
+            vector_index,
+            f"babyagi:{uuid.uuid4().hex}",
+            self._embed_documents
+        )
+
+    async def _embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts through the micro-batcher shared with concurrent requests."""
+        return await embed_documents(texts, self.config)
 
     def _create_task_creation_chain(self) -> LLMChain:
         """Create the chain for generating new tasks."""
@@ -45,7 +53,9 @@ Current task: {task_description}
 Incomplete tasks: {incomplete_tasks}
 Completed tasks: {completed_tasks}
 
-Create new tasks that are needed. Return only the new tasks, one per line."""
+Create new tasks that are needed. Return only the new tasks, one per line.
+If a task cannot start until other tasks are finished, end its line with
+[depends on: #id, #id] using the ids of those tasks."""
         )
         return LLMChain(llm=self.llm, prompt=prompt)
 
@@ -62,7 +72,7 @@ Prioritize these tasks based on:
 2. Complexity and time required
 3. Impact on achieving the overall objective
 
-Return the tasks in prioritized order, one per line."""
+Return the tasks in prioritized order, one per line, keeping each task's #id."""
         )
         return LLMChain(llm=self.llm, prompt=prompt)
 
@@ -83,81 +93,100 @@ Include any relevant information, insights, or conclusions."""
         """Execute the BabyAGI agent's main loop."""
         objective = user_input
         results = []
+        max_iterations = self.config.get("max_iterations", 5)
+        # Tasks run one at a time unless config opts in to running independent ones concurrently
+        max_parallel = max(1, self.config.get("max_parallel_tasks", 1))
         
         # Create initial task
-        self.task_list.append({
-            "id": self.task_id_counter,
-            "name": "Analyze objective and create initial tasks",
-            "description": f"Analyze the objective: {objective} and break it down into initial tasks"
-        })
-        self.task_id_counter += 1
+        self.scheduler.add(
+            "Analyze objective and create initial tasks",
+            f"Analyze the objective: {objective} and break it down into initial tasks"
+        )
         
-        # Main loop
-        while self.task_list and len(results) < self.config.get("max_iterations", 5):
-            # Get next task
-            current_task = self.task_list.pop(0)
-            
-            # Execute task
-            execution_result = await self.execution_chain.arun(
-                objective=objective,
-                task=current_task["description"]
-            )
-            
-            # Store result
-            results.append({
-                "task": current_task,
-                "result": execution_result
-            })
-            self.completed_tasks.append(current_task)
-            
-            # Create new tasks
-            new_tasks = await self.task_creation_chain.arun(
-                result=execution_result,
-                task_description=current_task["description"],
-                incomplete_tasks="\n".join(t["name"] for t in self.task_list),
-                completed_tasks="\n".join(t["name"] for t in self.completed_tasks)
-            )
-            
-            # Add new tasks
-            for task in new_tasks.split("\n"):
-                task = task.strip()
-                if task:
-                    self.task_list.append({
-                        "id": self.task_id_counter,
-                        "name": task,
-                        "description": task
+        # Main loop: keep up to max_parallel ready tasks running, starting new
+        # ones as soon as any finishes rather than waiting for the whole batch
+        running: Dict[asyncio.Future, Task] = {}
+        started = 0
+        try:
+            while True:
+                slots = min(max_parallel - len(running), max_iterations - started)
+                if slots > 0 and len(self.scheduler):
+                    incomplete_tasks = self.scheduler.describe_pending()
+                    for task in self.scheduler.pop_ready(slots):
+                        running[asyncio.ensure_future(self._run_task(objective, task, incomplete_tasks))] = task
+                        started += 1
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                finished = sorted(((running.pop(future), future.result()) for future in done),
+                                  key=lambda item: item[0].id)
+                for task, (execution_result, new_tasks) in finished:
+                    # Store result
+                    self.scheduler.complete(task)
+                    self.completed_tasks.append(task.to_dict())
+                    results.append({
+                        "task": task.to_dict(),
+                        "result": execution_result
                     })
-                    self.task_id_counter += 1
-            
-            # Prioritize tasks
-            if self.task_list:
-                prioritized_tasks = await self.task_prioritization_chain.arun(
-                    task_names="\n".join(t["name"] for t in self.task_list)
-                )
+                    self.emit("task_result", results[-1])
+                    
+                    # Add new tasks
+                    for line in new_tasks.split("\n"):
+                        name, dependencies = parse_task_line(line)
+                        if name:
+                            self.scheduler.add(name, dependencies=dependencies)
+                
+                # Prioritize tasks
+                if len(self.scheduler):
+                    prioritized_tasks = await self._run_chain(
+                        self.task_prioritization_chain,
+                        task_names=self.scheduler.describe_pending()
+                    )
+                    self.scheduler.reprioritize(prioritized_tasks)
                 
-                # Reorder task list based on prioritization
-                priority_dict = {task.strip(): i for i, task in enumerate(prioritized_tasks.split("\n"))}
-                self.task_list.sort(key=lambda x: priority_dict.get(x["name"], float("inf")))
-            
-            # Store tasks in vector store for future reference
-            if execution_result:
-                self.vectorstore.add_texts(
-                    texts=[execution_result],
-                    metadatas=[{"task": current_task["name"]}]
-                )
+                # Store results in vector store for future reference
+                executed = [(task, result) for task, (result, _) in finished if result]
+                if executed:
+                    await self.vectorstore.aadd_texts(
+                        texts=[result for _, result in executed],
+                        metadatas=[{"task": task.name} for task, _ in executed]
+                    )
+        finally:
+            for future in running:
+                future.cancel()
         
         return {
             "objective": objective,
             "completed_tasks": self.completed_tasks,
             "results": results,
-            "remaining_tasks": self.task_list
+            "remaining_tasks": [task.to_dict() for task in self.scheduler.pending()]
         }
 
+    async def _run_task(self, objective: str, task: Task, incomplete_tasks: str):
+        """Execute one task and ask for follow-up tasks. Returns ``(result, new_tasks)``."""
+        execution_result = await self._run_chain(
+            self.execution_chain,
+            objective=objective,
+            task=task.description
+        )
+        new_tasks = await self._run_chain(
+            self.task_creation_chain,
+            result=execution_result,
+            task_description=task.description,
+            incomplete_tasks=incomplete_tasks,
+            completed_tasks="\n".join(t["name"] for t in self.completed_tasks)
+        )
+        return execution_result, new_tasks
+
+    async def reset(self):
+        """Reset the task state and start a new vector index namespace between pooled requests."""
+        await super().reset()
+        self.scheduler = TaskScheduler()
+        self.completed_tasks = []
+        await self.vectorstore.adrop()
+        self.vectorstore = self._create_vectorstore()
+
     async def cleanup(self):
         """Clean up resources used by the BabyAGI agent."""
         await super().cleanup()  # Call parent cleanup
-        if hasattr(self, 'vectorstore'):
-            self.vectorstore.delete_collection()
-        self.task_list = []
-        self.completed_tasks = []
-        self.task_id_counter = 0 
\ No newline at end of file
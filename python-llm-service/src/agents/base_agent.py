@@ -1,10 +1,38 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, List
+import inspect
 import os
+import time
 from langchain.memory import ConversationBufferMemory
 from langchain.chat_models import ChatOpenAI
+from langchain.chains import LLMChain
+from langchain.callbacks.base import BaseCallbackHandler
+from langchain.schema import messages_from_dict, messages_to_dict
+from ..core.cassette import CASSETTE_REPLAY_API_KEY, llm_cassette
+from ..core.llm_cache import llm_cache
+from ..core.metrics import instrument_tool, llm_chain_errors, llm_chain_seconds, llm_tokens
+from ..core.profiler import stage
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """Count the prompt and completion tokens the API reports for each LLM call."""
+
+    run_inline = True  # Only increments counters, so there is no need for an executor hop
+
+    def __init__(self, agent_type: str, chain: str):
+        self.prompt_tokens = llm_tokens.labels(agent_type, chain, "prompt")
+        self.completion_tokens = llm_tokens.labels(agent_type, chain, "completion")
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage.get("prompt_tokens"):
+            self.prompt_tokens.inc(usage["prompt_tokens"])
+        if usage.get("completion_tokens"):
+            self.completion_tokens.inc(usage["completion_tokens"])
 
 class BaseAgent(ABC):
+    # Set by the agent registry; used to label metrics
+    agent_type: Optional[str] = None
+
     def __init__(self, config: Dict[str, Any]):
         """Initialize the base agent with common configuration."""
         self.config = config
@@ -12,23 +40,41 @@ class BaseAgent(ABC):
         
         # Initialize LLM with configurable parameters
         api_keys = self.config.get("apiKeys", {})
-        self.llm = ChatOpenAI(
+        api_key = api_keys.get("openai") or os.getenv("OPENAI_API_KEY")
+        if not api_key and llm_cassette is not None and llm_cassette.replaying:
+            api_key = CASSETTE_REPLAY_API_KEY
+        llm_class = ChatOpenAI
+        if llm_cassette is not None:
+            # Record or replay LLM calls (LLM_CASSETTE_MODE)
+            from .cassette_llm import CassetteChatOpenAI as llm_class
+        self.llm = llm_class(
             model_name=config.get("model_name", "gpt-3.5-turbo"),
             temperature=config.get("temperature", 0.7),
             max_tokens=config.get("max_tokens", 1000),
-            api_key=api_keys.get("openai") or os.getenv("OPENAI_API_KEY")
+            api_key=api_key
         )
         
+        # Cache completions when they are deterministic or caching is requested.
+        # Not with a cassette, where cache hits would go unrecorded.
+        self.cache_completions = bool(config.get("cache", self.llm.temperature == 0)) and llm_cassette is None
+
         # Initialize memory
         self.memory = ConversationBufferMemory(
             memory_key="chat_history",
             return_messages=True
         )
 
+        # Receives progress events while a streaming request is running
+        self._event_sink: Optional[Callable[[str, Dict[str, Any]], None]] = None
+
     def validate_api_keys(self):
         """Validate that required API keys are present."""
         api_keys = self.config.get("apiKeys", {})
         missing_keys = []
+
+        # Replayed calls never reach the API
+        if llm_cassette is not None and llm_cassette.replaying:
+            return
         
         # Check for OpenAI API key
         if not (api_keys.get("openai") or os.getenv("OPENAI_API_KEY")):
@@ -49,8 +95,97 @@ class BaseAgent(ABC):
         """
         pass
 
+    @property
+    def metrics_label(self) -> str:
+        return self.agent_type or type(self).__name__
+
+    def _chain_name(self, chain: LLMChain) -> str:
+        """Name a chain after the attribute holding it, e.g. ``planning_chain`` -> ``planning``."""
+        names = self.__dict__.setdefault("_chain_names", {})
+        name = names.get(id(chain))
+        if name is None:
+            name = next(
+                (attr[:-len("_chain")] for attr, value in vars(self).items()
+                 if value is chain and attr.endswith("_chain")),
+                "chain"
+            )
+            names[id(chain)] = name
+        return name
+
+    def token_usage_handler(self, chain_name: str) -> TokenUsageHandler:
+        return TokenUsageHandler(self.metrics_label, chain_name)
+
+    def instrument_tools(self, tools: List[Any]) -> List[Any]:
+        """Record call counts, errors and latency for each tool."""
+        for tool in tools:
+            tool.func = instrument_tool(tool.name, tool.func)
+        return tools
+
+    async def _run_chain(self, chain: LLMChain, **inputs: Any) -> str:
+        """Run an LLMChain, serving repeated prompts from the completion cache when enabled.
+
+        Latency, errors and token usage are recorded per chain.
+        """
+        name = self._chain_name(chain)
+        with stage("llm:" + name):
+            start = time.perf_counter()
+            cached = None
+            try:
+                if not self.cache_completions:
+                    return await chain.arun(**inputs, callbacks=[self.token_usage_handler(name)])
+
+                key = llm_cache.make_key(
+                    self.llm.model_name,
+                    self.llm.temperature,
+                    self.llm.max_tokens,
+                    chain.prompt.format(**inputs)
+                )
+                cached = await llm_cache.get(key)
+                if cached is not None:
+                    return cached
+
+                call_start = time.perf_counter()
+                completion = await chain.arun(**inputs, callbacks=[self.token_usage_handler(name)])
+                await llm_cache.put(key, completion, time.perf_counter() - call_start)
+                return completion
+            except Exception:
+                llm_chain_errors.labels(self.metrics_label, name).inc()
+                raise
+            finally:
+                hit = "true" if cached is not None else "false"
+                llm_chain_seconds.labels(self.metrics_label, name, hit).observe(time.perf_counter() - start)
+
+    def attach_event_sink(self, sink: Optional[Callable[[str, Dict[str, Any]], None]]):
+        """Route progress events for the current request to ``sink``."""
+        self._event_sink = sink
+
+    def emit(self, event: str, data: Dict[str, Any]):
+        """Forward a progress event to the attached sink, if any."""
+        if self._event_sink is not None:
+            self._event_sink(event, data)
+
+    def export_session_state(self) -> Dict[str, Any]:
+        """Return the conversation state to keep for a session between requests."""
+        chat_memory = getattr(self.memory, "chat_memory", None)
+        if chat_memory is None:
+            return {}
+        return {"messages": messages_to_dict(chat_memory.messages)}
+
+    def load_session_state(self, state: Dict[str, Any]):
+        """Restore conversation state saved by ``export_session_state``."""
+        chat_memory = getattr(self.memory, "chat_memory", None)
+        if chat_memory is not None and state.get("messages"):
+            chat_memory.messages = messages_from_dict(state["messages"])
+
+    async def reset(self):
+        """Reset per-request state so a pooled instance can serve the next request."""
+        self.attach_event_sink(None)
+        if getattr(self, 'memory', None) is not None:
+            result = self.memory.clear()
+            if inspect.isawaitable(result):
+                await result
+
     async def cleanup(self):
         """Clean up any resources used by the agent."""
         # Base implementation - can be overridden by subclasses
-        if hasattr(self, 'memory'):
-            await self.memory.clear() 
\ No newline at end of file
+        await self.reset()
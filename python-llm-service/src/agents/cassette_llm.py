@@ -0,0 +1,132 @@
+import asyncio
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain.chat_models import ChatOpenAI
+from langchain.embeddings import OpenAIEmbeddings
+from langchain.schema import ChatResult
+from langchain_community.chat_models.openai import convert_message_to_dict
+
+from ..core.cassette import Cassette, decode_vectors, encode_vectors, llm_cassette
+
+# Request parameters that change a completion; credentials, timeouts and streaming do not
+KEY_PARAMS = ("model", "temperature", "max_tokens", "n", "stop", "top_p", "presence_penalty",
+              "frequency_penalty", "logit_bias", "functions", "function_call", "tools", "tool_choice")
+
+
+def _to_response(result: ChatResult) -> Dict[str, Any]:
+    """An OpenAI-style response dict for a ChatResult, as ``_create_chat_result`` reads them."""
+    return {
+        "choices": [
+            {
+                "message": convert_message_to_dict(generation.message),
+                "finish_reason": (generation.generation_info or {}).get("finish_reason")
+            }
+            for generation in result.generations
+        ],
+        "usage": (result.llm_output or {}).get("token_usage", {})
+    }
+
+
+class CassetteChatOpenAI(ChatOpenAI):
+    """ChatOpenAI that records its calls to, or replays them from, the LLM cassette."""
+
+    @property
+    def cassette(self) -> Cassette:
+        return llm_cassette
+
+    def _cassette_request(self, messages, stop, kwargs) -> Dict[str, Any]:
+        message_dicts, params = self._create_message_dicts(messages, stop)
+        params = {**params, **kwargs}
+        return {
+            "messages": message_dicts,
+            "params": {name: params[name] for name in KEY_PARAMS if params.get(name) is not None}
+        }
+
+    @staticmethod
+    def _token_chunks(result: ChatResult) -> List[str]:
+        return re.findall(r"\S+\s*|\s+", result.generations[0].text) if result.generations else []
+
+    def _replay(self, request: Dict[str, Any]) -> Tuple[ChatResult, float]:
+        response, delay = self.cassette.replay("chat", request)
+        return self._create_chat_result(response), delay
+
+    def _generate(self, messages, stop=None, run_manager=None, stream: Optional[bool] = None, **kwargs: Any) -> ChatResult:
+        request = self._cassette_request(messages, stop, kwargs)
+        if self.cassette.replaying:
+            result, delay = self._replay(request)
+            time.sleep(delay)
+            if run_manager is not None and (stream if stream is not None else self.streaming):
+                for token in self._token_chunks(result):
+                    run_manager.on_llm_new_token(token)
+            return result
+
+        start = time.perf_counter()
+        result = super()._generate(messages, stop=stop, run_manager=run_manager, stream=stream, **kwargs)
+        self.cassette.record("chat", request, _to_response(result), time.perf_counter() - start)
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, stream: Optional[bool] = None,
+                         **kwargs: Any) -> ChatResult:
+        request = self._cassette_request(messages, stop, kwargs)
+        if self.cassette.replaying:
+            result, delay = self._replay(request)
+            await asyncio.sleep(delay)
+            if run_manager is not None and (stream if stream is not None else self.streaming):
+                for token in self._token_chunks(result):
+                    await run_manager.on_llm_new_token(token)
+            return result
+
+        start = time.perf_counter()
+        result = await super()._agenerate(messages, stop=stop, run_manager=run_manager, stream=stream, **kwargs)
+        self.cassette.record("chat", request, _to_response(result), time.perf_counter() - start)
+        return result
+
+
+class CassetteOpenAIEmbeddings(OpenAIEmbeddings):
+    """OpenAIEmbeddings that records its calls to, or replays them from, the LLM cassette.
+
+    Texts are recorded one per entry, since the micro-batcher groups texts
+    from concurrent requests differently from run to run.
+    """
+
+    @property
+    def cassette(self) -> Cassette:
+        return llm_cassette
+
+    def _replay(self, texts: List[str]) -> Tuple[List[List[float]], float]:
+        vectors: List[List[float]] = []
+        delay = 0.0
+        for text in texts:
+            packed, text_delay = self.cassette.replay("embedding", {"model": self.model, "text": text})
+            vectors.extend(decode_vectors(packed))
+            delay = max(delay, text_delay)  # The texts were embedded in one call
+        return vectors, delay
+
+    def _record(self, texts: List[str], vectors: List[List[float]], latency: float):
+        self.cassette.record_many("embedding", [
+            ({"model": self.model, "text": text}, encode_vectors([vector])) for text, vector in zip(texts, vectors)
+        ], latency)
+
+    def embed_documents(self, texts: List[str], chunk_size: Optional[int] = 0) -> List[List[float]]:
+        if self.cassette.replaying:
+            vectors, delay = self._replay(texts)
+            time.sleep(delay)
+            return vectors
+
+        start = time.perf_counter()
+        vectors = super().embed_documents(texts, chunk_size)
+        self._record(texts, vectors, time.perf_counter() - start)
+        return vectors
+
+    async def aembed_documents(self, texts: List[str], chunk_size: Optional[int] = 0) -> List[List[float]]:
+        if self.cassette.replaying:
+            vectors, delay = self._replay(texts)
+            await asyncio.sleep(delay)
+            return vectors
+
+        start = time.perf_counter()
+        vectors = await super().aembed_documents(texts, chunk_size)
+        self._record(texts, vectors, time.perf_counter() - start)
+        return vectors
@@ -0,0 +1,74 @@
+from typing import List, Optional
+
+from langchain.tools import Tool
+
+from ..utils.tokens import count_tokens, truncate_tokens
+
+
+class ContextBuilder:
+    """Render compact, token-budgeted prompt context for AutoGPT.
+
+    The tool manifest is rendered once. The plan history keeps the most
+    recent items verbatim and shortens older ones to a one-line extract, so
+    the rendered history stays within ``history_token_budget`` tokens. Token
+    counts and extracts are cached per item, so each call only tokenizes
+    items added since the previous one.
+    """
+
+    def __init__(self, tools: List[Tool], model_name: str = "gpt-3.5-turbo",
+                 history_token_budget: int = 1000, recent_items: int = 3, summary_tokens: int = 32):
+        self.model_name = model_name
+        self.history_token_budget = history_token_budget
+        self.recent_items = recent_items
+        self.summary_tokens = summary_tokens
+        self.tool_manifest = "\n".join(f"- {tool.name}: {tool.description}" for tool in tools) or "None"
+        self.reset()
+
+    def reset(self):
+        """Forget cached per-item counts and extracts."""
+        self._item_tokens: List[int] = []
+        self._summaries: List[str] = []
+        self._summary_tokens: List[int] = []
+
+    def count(self, text: str) -> int:
+        return count_tokens(text, self.model_name)
+
+    def _summarize(self, item: str) -> str:
+        first_line = item.strip().split("\n", 1)[0]
+        summary = truncate_tokens(first_line, self.summary_tokens, self.model_name)
+        return summary if summary == item.strip() else summary.rstrip() + " ..."
+
+    def _update_cache(self, items: List[str]):
+        if len(items) < len(self._item_tokens):
+            self.reset()
+        for item in items[len(self._item_tokens):]:
+            summary = self._summarize(item)
+            self._item_tokens.append(self.count(item))
+            self._summaries.append(summary)
+            self._summary_tokens.append(self.count(summary))
+
+    def history(self, items: List[str]) -> str:
+        """Render ``items`` (oldest first) as a numbered list within the token budget."""
+        if not items:
+            return "None"
+        self._update_cache(items)
+
+        lines: List[Optional[str]] = [None] * len(items)
+        used = 0
+        # Newest items first: verbatim while they fit, then one-line extracts
+        for i in range(len(items) - 1, -1, -1):
+            verbatim = len(items) - i <= self.recent_items
+            if verbatim and used + self._item_tokens[i] <= self.history_token_budget:
+                lines[i] = f"{i + 1}. {items[i]}"
+                used += self._item_tokens[i]
+            elif used + self._summary_tokens[i] <= self.history_token_budget:
+                lines[i] = f"{i + 1}. {self._summaries[i]}"
+                used += self._summary_tokens[i]
+            else:
+                break
+
+        omitted = sum(1 for line in lines if line is None)
+        rendered = [line for line in lines if line is not None]
+        if omitted:
+            rendered.insert(0, f"({omitted} earlier tasks omitted)")
+        return "\n".join(rendered)
@@ -27,11 +27,13 @@ class ElizaAgent(BaseAgent):
         """Initialize the appropriate memory type based on configuration."""
         memory_type = config.get('memoryType', 'emotional')
         context_window = config.get('contextWindow', 5)
+        token_limit = config.get('contextTokenLimit')
+        model_name = self.llm.model_name
         
         if memory_type == 'emotional':
-            return EmotionalMemory(window_size=context_window)
+            return EmotionalMemory(window_size=context_window, max_token_limit=token_limit, model_name=model_name)
         else:
-            return ConversationMemory(window_size=context_window)
+            return ConversationMemory(window_size=context_window, max_token_limit=token_limit, model_name=model_name)
             
     def initializeSocialPlatforms(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Initialize configured social platform integrations."""
@@ -94,7 +96,7 @@ class ElizaAgent(BaseAgent):
     def generateResponse(self, input: str, history: Dict[str, Any]) -> Dict[str, Any]:
         """Generate a response based on input and conversation history."""
         # Get pattern-based response
-        response = self.pattern_matcher.getResponse(
+        response = self.pattern_matcher.getTypedResponse(
             input,
             {
                 "reflection_level": self.reflection_level,
@@ -104,7 +106,7 @@ class ElizaAgent(BaseAgent):
         
         # Format response based on personality
         return {
-            'content': self.formatResponse(response),
+            'content': self.formatResponse(response['content']),
             'type': response.get('type', 'default')
         }
         
@@ -123,6 +125,14 @@ class ElizaAgent(BaseAgent):
             
         return f"{prefix}{response}"
         
+    def export_session_state(self) -> Dict[str, Any]:
+        """Return the conversation and emotional memory to keep for a session."""
+        return self.memory.exportState()
+
+    def load_session_state(self, state: Dict[str, Any]):
+        """Restore memory saved by ``export_session_state``."""
+        self.memory.loadState(state)
+
     async def cleanup(self):
         """Clean up resources."""
         if self.memory:
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Dict, List
+
+from ..core.cassette import CASSETTE_REPLAY_API_KEY, llm_cassette
+from ..core.embedding_batcher import EmbeddingBatcher
+
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", 64))
+EMBEDDING_BATCH_MAX_WAIT = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", 5)) / 1000
+
+_embeddings: Dict[str, Any] = {}
+# Batchers are tied to an event loop, so they are kept per loop and API key
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, EmbeddingBatcher]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _api_key(config: Dict[str, Any]) -> str:
+    return config.get("apiKeys", {}).get("openai") or os.getenv("OPENAI_API_KEY")
+
+
+def get_embeddings(config: Dict[str, Any]):
+    """Return a shared embeddings client for the OpenAI key in ``config``."""
+    # Imported here so importing this module (e.g. for stats) does not load langchain
+    if llm_cassette is not None:
+        from .cassette_llm import CassetteOpenAIEmbeddings as OpenAIEmbeddings
+    else:
+        from langchain.embeddings import OpenAIEmbeddings
+
+    api_key = _api_key(config)
+    if not api_key and llm_cassette is not None and llm_cassette.replaying:
+        api_key = CASSETTE_REPLAY_API_KEY
+    with _lock:
+        embeddings = _embeddings.get(api_key)
+        if embeddings is None:
+            embeddings = _embeddings[api_key] = OpenAIEmbeddings(openai_api_key=api_key)
+        return embeddings
+
+
+def get_batcher(config: Dict[str, Any]) -> EmbeddingBatcher:
+    """Return the micro-batcher for the running loop and the OpenAI key in ``config``."""
+    api_key = _api_key(config)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        batchers = _batchers.setdefault(loop, {})
+        batcher = batchers.get(api_key)
+    if batcher is None:
+        batcher = EmbeddingBatcher(
+            get_embeddings(config).aembed_documents,
+            max_batch_size=EMBEDDING_BATCH_MAX_SIZE,
+            max_wait=EMBEDDING_BATCH_MAX_WAIT
+        )
+        with _lock:
+            batcher = batchers.setdefault(api_key, batcher)
+    return batcher
+
+
+async def embed_documents(texts: List[str], config: Dict[str, Any]) -> List[List[float]]:
+    """Embed texts, batched together with concurrent requests using the same key."""
+    return await get_batcher(config).embed(texts)
+
+
+async def embed_query(text: str, config: Dict[str, Any]) -> List[float]:
+    """Embed a single piece of text with the client for ``config``."""
+    return (await embed_documents([text], config))[0]
+
+
+def batcher_stats() -> Dict[str, Any]:
+    """Sum micro-batcher counters across loops and API keys."""
+    totals = {"requests": 0, "batches": 0, "texts": 0, "full_flushes": 0, "timed_flushes": 0}
+    with _lock:
+        batchers = [b for per_loop in _batchers.values() for b in per_loop.values()]
+    for batcher in batchers:
+        for name, value in batcher.stats().items():
+            if name in totals:
+                totals[name] += value
+    totals["avg_batch_size"] = totals["texts"] / totals["batches"] if totals["batches"] else 0.0
+    totals["avg_batch_fill"] = totals["avg_batch_size"] / EMBEDDING_BATCH_MAX_SIZE
+    totals["max_batch_size"] = EMBEDDING_BATCH_MAX_SIZE
+    totals["max_wait_ms"] = EMBEDDING_BATCH_MAX_WAIT * 1000
+    return totals
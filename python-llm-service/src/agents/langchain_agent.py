@@ -6,17 +6,34 @@ from langchain.tools.ddg_search import DuckDuckGoSearchRun
 from langchain.tools.wikipedia.tool import WikipediaQueryRun
 from langchain.memory import ConversationBufferMemory
 from langchain.schema import AgentAction, AgentFinish
-from typing import List, Union, Dict, Any
+from langchain.callbacks.base import AsyncCallbackHandler
+from typing import List, Union, Dict, Any, Callable
 import re
 import os
 from dotenv import load_dotenv
 from langchain.utilities import GoogleSearchAPIWrapper, WikipediaAPIWrapper
-from langchain.tools import ShellTool
 from .base_agent import BaseAgent
-import subprocess
+from ..core.native_shell import run_command
+from ..core.profiler import stage
+from ..core.tool_cache import tool_cache
 
 load_dotenv()
 
+class EventStreamHandler(AsyncCallbackHandler):
+    """Forward LLM tokens and tool calls to an agent's event sink."""
+
+    def __init__(self, emit: Callable[[str, Dict[str, Any]], None]):
+        self.emit = emit
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.emit("token", {"token": token})
+
+    async def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        self.emit("tool_start", {"tool": serialized.get("name"), "input": input_str})
+
+    async def on_tool_end(self, output: str, **kwargs: Any) -> None:
+        self.emit("tool_end", {"output": output})
+
 class LangChainAgent(BaseAgent):
     def __init__(self, config: Dict[str, Any]):
         """Initialize LangChain agent with tools and agent executor."""
@@ -29,16 +46,17 @@ class LangChainAgent(BaseAgent):
         )
         
         # Initialize tools
-        self.tools = self._initialize_tools()
+        self.tools = self.instrument_tools(self._initialize_tools())
         
         # Initialize agent
-        self.agent = initialize_agent(
-            tools=self.tools,
-            llm=self.llm,
-            agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
-            memory=self.memory,
-            verbose=self.config.get("verbose", True)
-        )
+        with stage("initialize_agent"):
+            self.agent = initialize_agent(
+                tools=self.tools,
+                llm=self.llm,
+                agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
+                memory=self.memory,
+                verbose=self.config.get("verbose", True)
+            )
 
     def _initialize_tools(self) -> List[Tool]:
         """Initialize available tools for the agent."""
@@ -50,7 +68,7 @@ class LangChainAgent(BaseAgent):
             tools.append(
                 Tool(
                     name="web_search",
-                    func=search.run,
+                    func=tool_cache.wrap("web_search", search.run),
                     description="Search the web for information"
                 )
             )
@@ -60,51 +78,35 @@ class LangChainAgent(BaseAgent):
         tools.append(
             Tool(
                 name="wikipedia",
-                func=wiki.run,
+                func=tool_cache.wrap("wikipedia", wiki.run),
                 description="Search Wikipedia for information"
             )
         )
         
         # Shell command tool (with safety checks)
-        shell_tool = ShellTool()
         tools.append(
             Tool(
                 name="shell",
-                func=self._safe_shell_command,
+                func=run_command,
                 description="Execute shell commands safely"
             )
         )
         
         return tools
 
-    def _safe_shell_command(self, command: str) -> str:
-        """Safely execute shell commands."""
-        # List of allowed commands
-        allowed_commands = ['ls', 'pwd', 'echo', 'cat']
-        
-        # Parse command to get the base command
-        base_command = command.split()[0]
-        
-        if base_command not in allowed_commands:
-            return f"Command '{base_command}' is not allowed for security reasons"
-            
-        try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=5  # 5 second timeout
-            )
-            return result.stdout if result.returncode == 0 else result.stderr
-        except Exception as e:
-            return f"Error executing command: {str(e)}"
+    def attach_event_sink(self, sink):
+        """Route events to ``sink`` and switch the LLM to token streaming while attached."""
+        super().attach_event_sink(sink)
+        self.llm.streaming = sink is not None
 
     async def execute(self, user_input: str) -> Dict[str, Any]:
         """Execute the LangChain agent with the given input."""
         try:
-            # Run the agent
-            response = await self.agent.arun(input=user_input)
+            # Run the agent, streaming tokens and tool calls when a sink is attached
+            callbacks = [self.token_usage_handler("agent")]
+            if self._event_sink:
+                callbacks.append(EventStreamHandler(self.emit))
+            response = await self.agent.arun(input=user_input, callbacks=callbacks)
             
             return {
                 "response": response,
@@ -1,42 +1,106 @@
-from typing import Dict, Any, List
-from langchain.memory import BufferMemory
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional, Tuple
+from langchain.schema import AIMessage, BaseMessage, HumanMessage, messages_from_dict, messages_to_dict
+import numpy as np
+from ..utils.tokens import count_tokens
+from .affect_lexicon import AffectLexicon, load_lexicon
+
+# Tokens the chat format adds around every message (role and separators)
+MESSAGE_TOKEN_OVERHEAD = 4
 
 class ConversationMemory:
-    def __init__(self, window_size: int = 5):
-        self.memory = BufferMemory(
-            memory_key="chat_history",
-            return_messages=True,
-            max_token_limit=window_size * 200  # Approximate token limit based on window size
-        )
-        
+    """Sliding window of chat messages bounded by an exact token count.
+
+    Each message is tokenized once when it is saved and its count is kept
+    next to it, so the running total is maintained incrementally: saving
+    evicts from the front of the deque in O(1) per message and loading
+    never re-tokenizes the history.
+    """
+
+    def __init__(self, window_size: int = 5, max_token_limit: Optional[int] = None,
+                 model_name: str = "gpt-3.5-turbo"):
+        self.memory_key = "chat_history"
+        self.max_token_limit = max_token_limit or window_size * 200
+        self.model_name = model_name
+        self._messages: Deque[Tuple[BaseMessage, int]] = deque()
+        self._tokens = 0
+
+    @property
+    def tokenCount(self) -> int:
+        """Tokens currently held in the window."""
+        return self._tokens
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        return [message for message, _ in self._messages]
+
+    def countTokens(self, message: BaseMessage) -> int:
+        """Count the tokens a message takes up in a chat prompt."""
+        return count_tokens(message.content, self.model_name) + MESSAGE_TOKEN_OVERHEAD
+
+    def _append(self, message: BaseMessage, tokens: Optional[int] = None):
+        if tokens is None:
+            tokens = self.countTokens(message)
+        self._messages.append((message, tokens))
+        self._tokens += tokens
+
+    def _evict(self):
+        # Always keep the newest message, even if it alone exceeds the limit
+        while self._tokens > self.max_token_limit and len(self._messages) > 1:
+            _, tokens = self._messages.popleft()
+            self._tokens -= tokens
+
     async def loadMemoryVariables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """Load memory variables."""
-        return await self.memory.load_memory_variables(inputs)
+        return {self.memory_key: self.messages}
         
     async def saveContext(self, inputs: Dict[str, Any], outputs: Dict[str, Any]):
         """Save context from this conversation turn."""
-        await self.memory.save_context(inputs, outputs)
+        output = outputs.get("output", "")
+        if isinstance(output, dict):
+            output = output.get("content", "")
+        self._append(HumanMessage(content=str(inputs.get("input", ""))))
+        self._append(AIMessage(content=str(output)))
+        self._evict()
         
     async def clear(self):
         """Clear memory contents."""
-        await self.memory.clear()
+        self._messages.clear()
+        self._tokens = 0
+
+    def exportState(self) -> Dict[str, Any]:
+        """Export the stored messages, and their token counts, as plain data."""
+        return {
+            "messages": messages_to_dict(self.messages),
+            "token_counts": [tokens for _, tokens in self._messages],
+            "model_name": self.model_name
+        }
+
+    def loadState(self, state: Dict[str, Any]):
+        """Restore messages exported by exportState."""
+        self._messages.clear()
+        self._tokens = 0
+        messages = messages_from_dict(state.get("messages", []))
+        counts = state.get("token_counts")
+        # Counts are only reusable when they were taken with the same tokenizer
+        if state.get("model_name") != self.model_name or not counts or len(counts) != len(messages):
+            counts = [None] * len(messages)
+        for message, tokens in zip(messages, counts):
+            self._append(message, tokens)
+        self._evict()
 
 class EmotionalMemory(ConversationMemory):
-    def __init__(self, window_size: int = 5):
-        super().__init__(window_size)
+    def __init__(self, window_size: int = 5, max_token_limit: Optional[int] = None,
+                 model_name: str = "gpt-3.5-turbo", lexicon: Optional[AffectLexicon] = None):
+        super().__init__(window_size, max_token_limit, model_name)
         # Initialize emotional state (valence, arousal, dominance)
         self.valence = 0.0  # negative to positive
         self.arousal = 0.0  # calm to excited
         self.dominance = 0.0  # submissive to dominant
         self.alpha = 0.3  # learning rate for emotional state updates
         
-        # Define emotional keywords
-        self.positive_words = {'happy', 'good', 'great', 'wonderful', 'excited', 'love'}
-        self.negative_words = {'sad', 'bad', 'terrible', 'angry', 'hate', 'afraid'}
-        self.aroused_words = {'excited', 'angry', 'passionate', 'energetic', 'anxious'}
-        self.calm_words = {'peaceful', 'relaxed', 'calm', 'quiet', 'serene'}
-        self.dominant_words = {'must', 'should', 'will', 'definitely', 'always'}
-        self.submissive_words = {'maybe', 'perhaps', 'might', 'sometimes', 'possibly'}
+        # Shared valence/arousal/dominance lexicon
+        self.lexicon = lexicon or load_lexicon()
         
     async def saveContext(self, inputs: Dict[str, Any], outputs: Dict[str, Any]):
         """Save context and update emotional state."""
@@ -48,23 +112,7 @@ class EmotionalMemory(ConversationMemory):
             
     def updateEmotionalState(self, text: str):
         """Update emotional state based on input text."""
-        words = set(text.split())
-        
-        # Calculate emotional impacts
-        valence_impact = (
-            len(words & self.positive_words) - 
-            len(words & self.negative_words)
-        ) * 0.2
-        
-        arousal_impact = (
-            len(words & self.aroused_words) - 
-            len(words & self.calm_words)
-        ) * 0.2
-        
-        dominance_impact = (
-            len(words & self.dominant_words) - 
-            len(words & self.submissive_words)
-        ) * 0.2
+        valence_impact, arousal_impact, dominance_impact = self.lexicon.score(text)
         
         # Update states with smoothing
         self.valence = (1 - self.alpha) * self.valence + self.alpha * valence_impact
@@ -75,7 +123,45 @@ class EmotionalMemory(ConversationMemory):
         self.valence = max(-1.0, min(1.0, self.valence))
         self.arousal = max(-1.0, min(1.0, self.arousal))
         self.dominance = max(-1.0, min(1.0, self.dominance))
+
+    def updateEmotionalStates(self, texts: List[str]):
+        """Update emotional state from a batch of texts, in order (e.g. a replayed history)."""
+        impacts = self.lexicon.scoreMany(texts)
+        if not len(impacts):
+            return
+        state = np.array([self.valence, self.arousal, self.dominance])
+        decay = 1 - self.alpha
+        if len(impacts) > 1 and np.abs(impacts).max() <= 1 and np.abs(state).max() <= 1:
+            # Every step is a convex combination of values in [-1, 1], so
+            # clamping never triggers and the fold has a closed form
+            powers = decay ** np.arange(len(impacts) - 1, -1, -1)
+            state = decay ** len(impacts) * state + self.alpha * (powers @ impacts)
+        else:
+            for impact in impacts:
+                state = np.clip(decay * state + self.alpha * impact, -1.0, 1.0)
+        self.valence, self.arousal, self.dominance = (float(value) for value in state)
         
+    async def clear(self):
+        """Clear memory contents and return to a neutral emotional state."""
+        await super().clear()
+        self.valence = 0.0
+        self.arousal = 0.0
+        self.dominance = 0.0
+
+    def exportState(self) -> Dict[str, Any]:
+        """Export the stored messages along with the emotional state."""
+        state = super().exportState()
+        state["emotion"] = self.getEmotionalSummary()
+        return state
+
+    def loadState(self, state: Dict[str, Any]):
+        """Restore messages and emotional state exported by exportState."""
+        super().loadState(state)
+        emotion = state.get("emotion", {})
+        self.valence = emotion.get("valence", 0.0)
+        self.arousal = emotion.get("arousal", 0.0)
+        self.dominance = emotion.get("dominance", 0.0)
+
     def getEmotionalSummary(self) -> Dict[str, float]:
         """Get current emotional state."""
         return {
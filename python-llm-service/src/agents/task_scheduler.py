@@ -0,0 +1,136 @@
+import heapq
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Matches a trailing "[depends on: 3, 5]" annotation on an LLM-produced task
+DEPENDENCY_PATTERN = re.compile(r"\[\s*(?:depends|after)(?:\s+on)?\s*:\s*([^\]]*)\]", re.IGNORECASE)
+TASK_ID_PATTERN = re.compile(r"#(\d+)")
+
+
+class Task:
+    """Compact task record; ``priority`` orders the scheduler heap."""
+
+    __slots__ = ("id", "name", "description", "dependencies", "priority")
+
+    def __init__(self, task_id: int, name: str, description: str, dependencies: Iterable[int] = ()):
+        self.id = task_id
+        self.name = name
+        self.description = description
+        self.dependencies = tuple(dependencies)
+        self.priority: Tuple[float, int] = (float("inf"), task_id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "dependencies": list(self.dependencies)
+        }
+
+
+def parse_task_line(line: str) -> Tuple[str, List[int]]:
+    """Split an LLM task line into its name and declared dependency ids."""
+    dependencies: List[int] = []
+    match = DEPENDENCY_PATTERN.search(line)
+    if match:
+        dependencies = [int(d) for d in re.findall(r"\d+", match.group(1))]
+        line = line[:match.start()] + line[match.end():]
+    return line.strip(), dependencies
+
+
+class TaskScheduler:
+    """Priority heap of pending tasks with dependency tracking.
+
+    Tasks are popped in priority order once every dependency they declare
+    has completed. Dependencies on ids the scheduler never saw are treated
+    as satisfied. Reprioritizing rebuilds the heap in O(n) instead of
+    re-sorting; stale heap entries are skipped lazily on pop.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[Tuple[float, int], int]] = []
+        self._pending: Dict[int, Task] = {}
+        self._running: Set[int] = set()
+        self._completed: Set[int] = set()
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, name: str, description: Optional[str] = None, dependencies: Iterable[int] = ()) -> Task:
+        """Queue a new task behind everything already pending."""
+        task = Task(self._next_id, name, description or name, dependencies)
+        task.priority = (float("inf"), task.id)
+        self._next_id += 1
+        self._pending[task.id] = task
+        heapq.heappush(self._heap, (task.priority, task.id))
+        return task
+
+    def _is_ready(self, task: Task) -> bool:
+        return all(
+            dep in self._completed or (dep not in self._pending and dep not in self._running)
+            for dep in task.dependencies
+        )
+
+    def pop_ready(self, limit: int) -> List[Task]:
+        """Remove and return up to ``limit`` tasks whose dependencies are met."""
+        ready: List[Task] = []
+        blocked: List[Tuple[Tuple[float, int], int]] = []
+
+        while self._heap and len(ready) < limit:
+            entry = heapq.heappop(self._heap)
+            task = self._pending.get(entry[1])
+            if task is None or task.priority != entry[0]:
+                continue  # Stale entry left behind by a reprioritization
+            if self._is_ready(task):
+                ready.append(task)
+            else:
+                blocked.append(entry)
+
+        # Nothing can make progress (e.g. a dependency cycle): run the most
+        # urgent blocked task rather than stalling forever.
+        if not ready and blocked and not self._running:
+            ready.append(self._pending[blocked.pop(0)[1]])
+
+        for entry in blocked:
+            heapq.heappush(self._heap, entry)
+        for task in ready:
+            del self._pending[task.id]
+            self._running.add(task.id)
+        return ready
+
+    def complete(self, task: Task):
+        self._running.discard(task.id)
+        self._completed.add(task.id)
+
+    def reprioritize(self, response: str):
+        """Reorder pending tasks from an LLM prioritization response.
+
+        Lines are matched by ``#id`` when present and by exact task name
+        otherwise; tasks the response does not mention keep their relative
+        order after the ones it does.
+        """
+        by_name = {task.name: task for task in self._pending.values()}
+        rank: Dict[int, int] = {}
+        for line in response.split("\n"):
+            line = line.strip()
+            match = TASK_ID_PATTERN.search(line)
+            task_id = int(match.group(1)) if match else None
+            if task_id not in self._pending:
+                task = by_name.get(line)
+                task_id = task.id if task else None
+            if task_id is not None and task_id not in rank:
+                rank[task_id] = len(rank)
+
+        for task in self._pending.values():
+            task.priority = (rank.get(task.id, float("inf")), task.priority[1])
+        self._heap = [(task.priority, task.id) for task in self._pending.values()]
+        heapq.heapify(self._heap)
+
+    def pending(self) -> List[Task]:
+        """Pending tasks in priority order."""
+        return sorted(self._pending.values(), key=lambda task: task.priority)
+
+    def describe_pending(self) -> str:
+        """Render pending tasks one per line as ``#id: name`` for prompts."""
+        return "\n".join(f"#{task.id}: {task.name}" for task in self.pending())
@@ -118,4 +118,10 @@ Think about your response:
             }
             
         except Exception as e:
-            raise Exception(f"Error executing ZerePy agent: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Error executing ZerePy agent: {str(e)}")
+
+    async def reset(self):
+        """Reset conversation state between pooled requests."""
+        await super().reset()
+        self.context = ""
+        self.conversation_history = []
@@ -1,9 +1,8 @@
 from flask import Flask, request, jsonify
 import os
 from dotenv import load_dotenv
-from agents.langchain_agent import LangChainAgent
-import asyncio
-from functools import wraps
+from src.agents.langchain_agent import LangChainAgent
+from src.core.async_utils import async_route
 import logging
 
 load_dotenv()
@@ -14,12 +13,6 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-def async_route(f):
-    @wraps(f)
-    def wrapped(*args, **kwargs):
-        return asyncio.run(f(*args, **kwargs))
-    return wrapped
-
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
@@ -0,0 +1,190 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from .metrics import admission_in_flight, admission_queue_depth, admission_rejected, admission_wait_seconds
+
+
+class AdmissionRejected(Exception):
+    """The request was not admitted; clients should retry after ``retry_after`` seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def tenant_key(api_key: Optional[str], header_value: Optional[str] = None, remote_addr: Optional[str] = None) -> str:
+    """Identify a tenant by a trusted header value, else a hash of its API key, else its address.
+
+    ``header_value`` must only be passed when the header is set by a trusted
+    proxy; a client could otherwise pick any tenant it liked.
+    """
+    if header_value:
+        return f"header:{header_value}"
+    if api_key:
+        return "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    if remote_addr:
+        return f"addr:{remote_addr}"
+    return "anonymous"
+
+
+class Ticket:
+    """An admitted request's slot; ``release`` is safe to call more than once."""
+
+    __slots__ = ("_controller", "tenant", "weight", "admitted_at", "_released")
+
+    def __init__(self, controller: "AdmissionController", tenant: str, weight: int):
+        self._controller = controller
+        self.tenant = tenant
+        self.weight = weight
+        self.admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._controller._release(self)
+
+
+class _Waiter:
+    __slots__ = ("tenant", "weight", "admitted", "event")
+
+    def __init__(self, tenant: str, weight: int):
+        self.tenant = tenant
+        self.weight = weight
+        self.admitted = False
+        self.event = threading.Event()
+
+
+class AdmissionController:
+    """Bounded in-flight requests with a bounded FIFO wait queue and per-tenant quotas.
+
+    ``acquire`` admits a request when fewer than ``max_in_flight`` units
+    are running and nobody is queued, waits up to ``queue_timeout`` in a
+    queue of at most ``max_queue`` requests otherwise, and raises
+    ``AdmissionRejected`` when the queue is full, the wait times out or the
+    tenant already has ``tenant_max`` requests running or queued. Queued
+    requests are admitted strictly in arrival order, so a heavy batch at
+    the head is not overtaken by lighter requests behind it. Waiting blocks
+    the calling thread, so it must be called from a request thread, never
+    from the event loop. A ``max_in_flight`` of 0 admits everything.
+    """
+
+    def __init__(self, max_in_flight: int = 32, max_queue: int = 64, queue_timeout: float = 30.0,
+                 tenant_max: int = 0):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.tenant_max = tenant_max
+        self._in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._tenants: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # Moving average of how long admitted requests hold their slot, for Retry-After
+        self._avg_seconds = 1.0
+
+        # Counters
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0
+
+    def _retry_after(self) -> int:
+        # Time for the queue ahead to drain at the current service rate
+        backlog = (len(self._waiters) + 1) / max(1, self.max_in_flight)
+        return max(1, min(60, math.ceil(self._avg_seconds * max(1.0, backlog))))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        admission_rejected.labels(reason).inc()
+        return AdmissionRejected(reason, self._retry_after())
+
+    def _admit_waiters(self):
+        """Admit queued requests from the head of the queue while they fit."""
+        while self._waiters and self._in_flight + self._waiters[0].weight <= self.max_in_flight:
+            waiter = self._waiters.popleft()
+            self._in_flight += waiter.weight
+            self.admitted += 1
+            waiter.admitted = True
+            waiter.event.set()
+        admission_queue_depth.labels().set(len(self._waiters))
+        admission_in_flight.labels().set(self._in_flight)
+
+    def acquire(self, tenant: str = "anonymous", weight: int = 1) -> Ticket:
+        """Admit a request of ``weight`` units for ``tenant`` or raise ``AdmissionRejected``."""
+        weight = max(1, min(weight, self.max_in_flight)) if self.enabled else weight
+        start = time.monotonic()
+        with self._lock:
+            if self.tenant_max and self._tenants.get(tenant, 0) >= self.tenant_max:
+                raise self._reject("tenant_quota")
+            if not self.enabled or (not self._waiters and self._in_flight + weight <= self.max_in_flight):
+                self._in_flight += weight
+                self._tenants[tenant] = self._tenants.get(tenant, 0) + 1
+                self.admitted += 1
+                admission_in_flight.labels().set(self._in_flight)
+                waiter = None
+            else:
+                if len(self._waiters) >= self.max_queue:
+                    raise self._reject("queue_full")
+                waiter = _Waiter(tenant, weight)
+                self._waiters.append(waiter)
+                self._tenants[tenant] = self._tenants.get(tenant, 0) + 1
+                admission_queue_depth.labels().set(len(self._waiters))
+
+        if waiter is not None:
+            waiter.event.wait(self.queue_timeout)
+            with self._lock:
+                # Checked under the lock, since admission can race the timeout
+                if not waiter.admitted:
+                    self._waiters.remove(waiter)
+                    self._tenants[tenant] -= 1
+                    self._drop_tenant(tenant)
+                    # A heavy request leaving the head may let the ones behind it in
+                    self._admit_waiters()
+                    raise self._reject("queue_timeout")
+        admission_wait_seconds.labels().observe(time.monotonic() - start)
+        return Ticket(self, tenant, weight)
+
+    def _drop_tenant(self, tenant: str):
+        if self._tenants.get(tenant) == 0:
+            del self._tenants[tenant]
+
+    def _release(self, ticket: Ticket):
+        held = time.monotonic() - ticket.admitted_at
+        with self._lock:
+            self._in_flight -= ticket.weight
+            self._tenants[ticket.tenant] -= 1
+            self._drop_tenant(ticket.tenant)
+            self._avg_seconds += 0.1 * (held - self._avg_seconds)
+            self._admit_waiters()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "in_flight": self._in_flight,
+                "queued": len(self._waiters),
+                "tenants": len(self._tenants),
+                "admitted": self.admitted,
+                "rejected": dict(self.rejected),
+                "avg_request_seconds": round(self._avg_seconds, 3),
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "queue_timeout": self.queue_timeout,
+                "tenant_max": self.tenant_max
+            }
+
+
+admission_controller = AdmissionController(
+    max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", 32)),
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", 64)),
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 30)),
+    tenant_max=int(os.getenv("ADMISSION_TENANT_MAX", 0))
+)
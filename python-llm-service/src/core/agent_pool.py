@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Config keys that only affect how a single request is served, never how the
+# agent itself is constructed. They are left out of the pool key so that
+# toggling them does not force a fresh agent build.
+REQUEST_ONLY_CONFIG_KEYS = frozenset({
+    "semantic_cache",
+    "semantic_cache_threshold",
+    "cache_bypass",
+    "profile",
+    "coalesce"
+})
+
+
+def normalize_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Drop request-only keys and unset values so equivalent configs compare equal."""
+    def _clean(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {k: _clean(v) for k, v in value.items() if v is not None}
+        if isinstance(value, (list, tuple)):
+            return [_clean(v) for v in value]
+        return value
+
+    config = config or {}
+    return _clean({k: v for k, v in config.items() if k not in REQUEST_ONLY_CONFIG_KEYS})
+
+
+def pool_key(agent_type: str, config: Optional[Dict[str, Any]]) -> str:
+    """Hash the agent type and normalized config into a stable pool key."""
+    payload = json.dumps(
+        {"agent_type": agent_type, "config": normalize_config(config)},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AgentPool:
+    """Process-wide pool of idle, pre-built agents keyed by type and config.
+
+    An agent is used by a single request at a time: ``checkout`` hands out an
+    idle instance (or builds one on a miss) and ``checkin`` resets its
+    per-request state before making it available again. At most ``max_size``
+    idle agents are kept; the least recently used key is evicted first.
+    """
+
+    def __init__(self, factory: Callable[[str, Dict[str, Any]], Any], max_size: int = 16):
+        self._factory = factory
+        self.max_size = max_size
+        self._idle: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._idle_count = 0
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.checked_out = 0
+
+    def _take_idle(self, key: str) -> Optional[Any]:
+        with self._lock:
+            instances = self._idle.get(key)
+            if not instances:
+                self.misses += 1
+                return None
+            agent = instances.pop()
+            self._idle_count -= 1
+            if instances:
+                self._idle.move_to_end(key)
+            else:
+                del self._idle[key]
+            self.hits += 1
+            self.checked_out += 1
+            return agent
+
+    async def checkout(self, agent_type: str, config: Dict[str, Any]) -> Tuple[str, Any]:
+        """Return ``(key, agent)``, building the agent off the event loop on a miss."""
+        key = pool_key(agent_type, config)
+        agent = self._take_idle(key)
+        if agent is None:
+            agent = await asyncio.to_thread(self._factory, agent_type, config)
+            with self._lock:
+                self.checked_out += 1
+        return key, agent
+
+    async def checkin(self, key: str, agent: Any):
+        """Reset the agent's per-request state and return it to the pool."""
+        try:
+            await agent.reset()
+        except Exception:
+            # An agent that cannot be reset is not safe to hand out again
+            self.discard(key, agent)
+            return
+
+        with self._lock:
+            self.checked_out -= 1
+            if self.max_size <= 0:
+                return
+            self._idle.setdefault(key, []).append(agent)
+            self._idle.move_to_end(key)
+            self._idle_count += 1
+
+            while self._idle_count > self.max_size:
+                oldest_key, instances = next(iter(self._idle.items()))
+                instances.pop(0)
+                self._idle_count -= 1
+                self.evictions += 1
+                if not instances:
+                    del self._idle[oldest_key]
+
+    def discard(self, key: str, agent: Any):
+        """Forget a checked-out agent without returning it to the pool."""
+        with self._lock:
+            self.checked_out -= 1
+
+    @asynccontextmanager
+    async def lease(self, agent_type: str, config: Dict[str, Any]):
+        """Check an agent out for the duration of a request.
+
+        Agents whose request raised are discarded rather than reused.
+        """
+        key, agent = await self.checkout(agent_type, config)
+        try:
+            yield agent
+        except BaseException:
+            self.discard(key, agent)
+            raise
+        await self.checkin(key, agent)
+
+    def clear(self, agent_type: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> int:
+        """Drop idle agents for one type/config, or all of them. Returns the number dropped."""
+        with self._lock:
+            if agent_type is None:
+                dropped = self._idle_count
+                self._idle.clear()
+            else:
+                dropped = len(self._idle.pop(pool_key(agent_type, config), []))
+            self._idle_count -= dropped
+            return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "idle": self._idle_count,
+                "keys": len(self._idle),
+                "checked_out": self.checked_out,
+                "max_size": self.max_size
+            }
@@ -0,0 +1,104 @@
+import importlib
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .profiler import stage
+
+# agent_type -> (module under the agents package, class name, display label)
+AGENT_SPECS: Dict[str, Tuple[str, str, str]] = {
+    "zerepy": ("zerepy_agent", "ZerePyAgent", "ZerePy"),
+    "langchain": ("langchain_agent", "LangChainAgent", "LangChain"),
+    "babyagi": ("babyagi_agent", "BabyAGIAgent", "BabyAGI"),
+    "autogpt": ("autogpt_agent", "AutoGPTAgent", "AutoGPT"),
+}
+
+# Agents are resolved relative to this package's parent (e.g. ``src.agents``)
+AGENTS_PACKAGE = (__package__.rpartition(".")[0] + ".agents") if "." in (__package__ or "") else "agents"
+
+
+def parse_enabled_agents(value: Optional[str]) -> Optional[List[str]]:
+    """Parse ``ENABLED_AGENTS`` ("langchain,babyagi"); empty means every agent."""
+    if not value or not value.strip():
+        return None
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in AGENT_SPECS]
+    if unknown:
+        raise ValueError(f"Unknown agent types in ENABLED_AGENTS: {', '.join(unknown)}")
+    return names
+
+
+class AgentRegistry:
+    """Agent classes imported on first use, with import timings.
+
+    With an ``enabled`` allow-list only those agent types are served and
+    their modules are imported by ``preload`` at startup; otherwise every
+    known type is served and imported the first time it is requested.
+    """
+
+    def __init__(self, specs: Dict[str, Tuple[str, str, str]] = AGENT_SPECS,
+                 enabled: Optional[Iterable[str]] = None, package: str = AGENTS_PACKAGE):
+        self.specs = specs
+        self.package = package
+        self.enabled = list(enabled) if enabled is not None else list(specs)
+        self._classes: Dict[str, type] = {}
+        self._import_seconds: Dict[str, float] = {}
+        self._construct_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, agent_type: str) -> bool:
+        return agent_type in self.enabled
+
+    def label(self, agent_type: str) -> str:
+        return self.specs[agent_type][2]
+
+    def get(self, agent_type: str) -> type:
+        """Return the agent class, importing its module on first use."""
+        cls = self._classes.get(agent_type)
+        if cls is not None:
+            return cls
+        if agent_type not in self:
+            raise KeyError(f"Unsupported agent type: {agent_type}")
+
+        module_name, class_name, _ = self.specs[agent_type]
+        with self._lock:
+            cls = self._classes.get(agent_type)
+            if cls is None:
+                start = time.perf_counter()
+                module = importlib.import_module(f"{self.package}.{module_name}")
+                cls = getattr(module, class_name)
+                self._import_seconds[agent_type] = time.perf_counter() - start
+                self._classes[agent_type] = cls
+        return cls
+
+    def build(self, agent_type: str, config: Dict[str, Any]):
+        """Construct a new agent instance."""
+        cls = self.get(agent_type)
+        start = time.perf_counter()
+        with stage("construct"):
+            agent = cls(config)
+        agent.agent_type = agent_type
+        self._construct_seconds.setdefault(agent_type, time.perf_counter() - start)
+        return agent
+
+    def preload(self):
+        """Import every enabled agent module now rather than on first request."""
+        for agent_type in self.enabled:
+            self.get(agent_type)
+
+    def report(self) -> Dict[str, Any]:
+        """Per-agent import and first-construction times."""
+        return {
+            agent_type: {
+                "loaded": agent_type in self._classes,
+                "import_seconds": round(self._import_seconds[agent_type], 4) if agent_type in self._import_seconds else None,
+                "first_construct_seconds": (
+                    round(self._construct_seconds[agent_type], 4) if agent_type in self._construct_seconds else None
+                )
+            }
+            for agent_type in self.enabled
+        }
+
+
+agent_registry = AgentRegistry(enabled=parse_enabled_agents(os.getenv("ENABLED_AGENTS")))
@@ -0,0 +1,68 @@
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton mapping literal keywords to integer labels.
+
+    ``find(text)`` scans the text once and returns the labels of every
+    keyword occurring in it, so the cost depends on the text length and
+    the number of hits rather than on how many keywords are indexed.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, int]] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[int]] = [set()]
+        self._built = True
+        for keyword, label in keywords:
+            self.add(keyword, label)
+        self.build()
+
+    def add(self, keyword: str, label: int):
+        """Index ``keyword`` under ``label``. Call ``build`` before searching again."""
+        if not keyword:
+            raise ValueError("Keywords must be non-empty")
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = next_state
+        self._output[state].add(label)
+        self._built = False
+
+    def build(self):
+        """Compute failure links breadth-first."""
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+        self._built = True
+
+    def find(self, text: str) -> Set[int]:
+        """Return the labels of all keywords found in ``text``."""
+        if not self._built:
+            self.build()
+        goto, fail, output = self._goto, self._fail, self._output
+        labels: Set[int] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                labels |= output[state]
+        return labels
@@ -1,9 +1,167 @@
 import asyncio
+import atexit
+import os
+import threading
+from concurrent.futures import Future
 from functools import wraps
+from typing import Any, Awaitable, Optional
+
+from flask import has_request_context
+
+try:
+    # Flask >= 2.2
+    from flask.globals import request_ctx as _request_ctx
+
+    def _copy_request_context():
+        return _request_ctx.copy()
+except ImportError:
+    from flask import _request_ctx_stack
+
+    def _copy_request_context():
+        return _request_ctx_stack.top.copy()
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+try:
+    import openai
+except ImportError:  # pragma: no cover - optional dependency
+    openai = None
+
+# "persistent" runs every request on one long-lived loop per worker process;
+# "per-request" keeps the old behaviour of asyncio.run() for each request.
+ASYNC_LOOP_MODE = os.getenv("ASYNC_LOOP_MODE", "persistent")
+
+
+class LoopThread:
+    """A long-lived event loop running in a dedicated daemon thread.
+
+    Flask handler threads submit coroutines to it and block on the result, so
+    connection pools, sessions and cached coroutine state survive between
+    requests. The loop is started lazily, which keeps it safe to import
+    before a pre-forking server (e.g. gunicorn) forks its workers.
+    """
+
+    def __init__(self, name: str = "async-route-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._http_session = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self.start()
+        return self._loop
+
+    def start(self):
+        """Start the loop thread if it is not running yet."""
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        """Schedule a coroutine on the loop and return a concurrent future."""
+        return asyncio.run_coroutine_threadsafe(self._with_shared_clients(coro), self.loop)
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """Run a coroutine on the loop and block until it finishes."""
+        return self.submit(coro).result()
+
+    async def _with_shared_clients(self, coro: Awaitable[Any]) -> Any:
+        # openai keeps its aiohttp session in a context variable, so it has
+        # to be set inside every task for the shared session to be picked up.
+        if aiohttp is not None and openai is not None and hasattr(openai, "aiosession"):
+            openai.aiosession.set(self.http_session())
+        return await coro
+
+    def http_session(self):
+        """Return the aiohttp session shared by all requests on this loop."""
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession()
+        return self._http_session
+
+    def stop(self, timeout: float = 5.0):
+        """Close shared clients and stop the loop thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        async def close_clients():
+            if self._http_session is not None and not self._http_session.closed:
+                await self._http_session.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_clients(), loop).result(timeout)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not loop.is_running():
+            loop.close()
+
+
+loop_thread = LoopThread()
+atexit.register(loop_thread.stop)
+
+
+def run_coroutine(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine to completion from synchronous code using the configured loop mode."""
+    if ASYNC_LOOP_MODE == "per-request":
+        return asyncio.run(coro)
+    return loop_thread.run(coro)
+
+
+def submit_coroutine(coro: Awaitable[Any]) -> Future:
+    """Start a coroutine without waiting for it and return a concurrent future."""
+    if ASYNC_LOOP_MODE != "per-request":
+        return loop_thread.submit(coro)
+
+    future: Future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(asyncio.run(coro))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
 
 def async_route(f):
     """Decorator to handle async route functions in Flask."""
     @wraps(f)
     def wrapped(*args, **kwargs):
-        return asyncio.run(f(*args, **kwargs))
-    return wrapped 
\ No newline at end of file
+        if ASYNC_LOOP_MODE == "per-request" or not has_request_context():
+            return run_coroutine(f(*args, **kwargs))
+
+        # The coroutine runs on the loop thread, so carry the request
+        # context over for `request`, `jsonify` and friends.
+        ctx = _copy_request_context()
+
+        async def run_in_request_context():
+            with ctx:
+                return await f(*args, **kwargs)
+
+        return loop_thread.run(run_in_request_context())
+    return wrapped
@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU cache with optional per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None):
+        if self.max_entries <= 0:
+            return
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk key/value tier backed by SQLite with per-entry expiry.
+
+    Values are stored as text; callers serialize anything richer. The
+    database file is only created on first use. Expired rows are deleted
+    when the database is opened and then by a write at most every
+    ``purge_interval`` seconds, so entries that are never read again do
+    not pile up.
+    """
+
+    def __init__(self, path: str, table: str = "cache", purge_interval: float = 3600.0):
+        self.path = path
+        self.table = table
+        self.purge_interval = purge_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "cost REAL NOT NULL DEFAULT 0, expires_at REAL)"
+            )
+            self._conn = conn
+            self._purge()
+        return self._conn
+
+    def _purge(self) -> int:
+        cursor = self._conn.execute(
+            f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        )
+        self._conn.commit()
+        self._next_purge = time.time() + self.purge_interval
+        return cursor.rowcount
+
+    def get(self, key: str) -> Optional[Tuple[str, float, Optional[float]]]:
+        """Return ``(value, cost, seconds_left)`` for a live entry, or None.
+
+        ``seconds_left`` is None for entries that never expire.
+        """
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT value, cost, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, cost, expires_at = row
+            now = time.time()
+            if expires_at is not None and expires_at <= now:
+                self._connection().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._connection().commit()
+                return None
+            return value, cost, (expires_at - now if expires_at is not None else None)
+
+    def put(self, key: str, value: str, cost: float = 0.0, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, cost, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, cost, expires_at)
+            )
+            conn.commit()
+            if time.time() >= self._next_purge:
+                self._purge()
+
+    def purge_expired(self) -> int:
+        """Delete expired rows. Returns the number removed."""
+        with self._lock:
+            self._connection()
+            return self._purge()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,169 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+MODES = ("record", "replay")
+
+# Placeholder credentials for clients built while replaying without an API key
+CASSETTE_REPLAY_API_KEY = "sk-cassette-replay"
+
+
+class CassetteMiss(LookupError):
+    """A replayed request has no recording in the cassette."""
+
+
+def parse_latency(value: str) -> float:
+    """Parse ``LLM_CASSETTE_LATENCY``: "original" (1.0), "zero" (0.0) or a scale factor."""
+    value = (value or "original").strip().lower()
+    if value == "original":
+        return 1.0
+    if value == "zero":
+        return 0.0
+    return max(0.0, float(value))
+
+
+def encode_vectors(vectors: List[List[float]]) -> Dict[str, Any]:
+    """Pack embedding vectors as base64 float32, about a quarter the size of JSON floats."""
+    array = np.asarray(vectors, dtype=np.float32)
+    return {"shape": list(array.shape), "data": base64.b64encode(array.tobytes()).decode("ascii")}
+
+
+def decode_vectors(packed: Dict[str, Any]) -> List[List[float]]:
+    array = np.frombuffer(base64.b64decode(packed["data"]), dtype=np.float32).reshape(packed["shape"])
+    return array.astype(float).tolist()
+
+
+class Cassette:
+    """Recorded LLM and embedding calls, appended to or replayed from a JSON-lines file.
+
+    Each line holds one call: its kind, a hash of the request, the request
+    itself, the response and how long the call took. In record mode calls
+    go upstream and are appended as they finish; in replay mode they are
+    served from the file, waiting the recorded latency times
+    ``latency_scale``. Identical requests recorded several times are
+    replayed in recording order, the last one repeating once exhausted.
+    Paths ending in ``.gz`` are gzip-compressed.
+    """
+
+    def __init__(self, path: str, mode: str, latency_scale: float = 1.0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode} (expected one of {', '.join(MODES)})")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._entries: Optional[Dict[str, List[Tuple[Any, float]]]] = None
+        self._cursors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+        # Counters
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def make_key(kind: str, request: Dict[str, Any]) -> str:
+        payload = json.dumps([kind, request], sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def _open(self, mode: str):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def _load(self) -> Dict[str, List[Tuple[Any, float]]]:
+        if self._entries is None:
+            entries: Dict[str, List[Tuple[Any, float]]] = defaultdict(list)
+            if os.path.exists(self.path):
+                with self._open("r") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            entries[entry["key"]].append((entry["response"], entry["latency"]))
+            self._entries = entries
+        return self._entries
+
+    def record(self, kind: str, request: Dict[str, Any], response: Any, latency: float):
+        """Append one call to the cassette file."""
+        self.record_many(kind, [(request, response)], latency)
+
+    def record_many(self, kind: str, calls: List[Tuple[Dict[str, Any], Any]], latency: float):
+        """Append ``(request, response)`` pairs that were served by one upstream call."""
+        lines = "".join(
+            json.dumps({
+                "kind": kind,
+                "key": self.make_key(kind, request),
+                "latency": round(latency, 6),
+                "request": request,
+                "response": response
+            }, separators=(",", ":"), default=str) + "\n"
+            for request, response in calls
+        )
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._open("a") as f:
+                f.write(lines)
+            self.recorded += len(calls)
+
+    def replay(self, kind: str, request: Dict[str, Any]) -> Tuple[Any, float]:
+        """Return the next recorded ``(response, delay)`` for a request.
+
+        ``delay`` is the recorded latency scaled by ``latency_scale``.
+        """
+        key = self.make_key(kind, request)
+        with self._lock:
+            recordings = self._load().get(key)
+            if not recordings:
+                self.misses += 1
+                raise CassetteMiss(f"No {kind} recording for request {key} in {self.path}")
+            index = min(self._cursors[key], len(recordings) - 1)
+            self._cursors[key] += 1
+            self.replayed += 1
+        response, latency = recordings[index]
+        return response, latency * self.latency_scale
+
+    def rewind(self):
+        """Replay every recording from the start again."""
+        with self._lock:
+            self._cursors.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "path": self.path,
+                "latency_scale": self.latency_scale,
+                "recorded": self.recorded,
+                "replayed": self.replayed,
+                "misses": self.misses
+            }
+
+
+def cassette_from_env() -> Optional[Cassette]:
+    mode = os.getenv("LLM_CASSETTE_MODE", "").strip().lower()
+    if not mode:
+        return None
+    return Cassette(
+        path=os.getenv("LLM_CASSETTE_PATH", ".cache/llm_cassette.jsonl"),
+        mode=mode,
+        latency_scale=parse_latency(os.getenv("LLM_CASSETTE_LATENCY", "original"))
+    )
+
+
+llm_cassette = cassette_from_env()
@@ -0,0 +1,101 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+Embedder = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+class EmbeddingBatcher:
+    """Coalesce embedding requests from concurrent callers into batched calls.
+
+    Requests queue up until ``max_batch_size`` texts are pending or
+    ``max_wait`` seconds have passed since the first one, then go out as a
+    single ``embed_documents`` call and the vectors are fanned back out to
+    the awaiting callers. A batcher belongs to the event loop it is first
+    used on.
+    """
+
+    def __init__(self, embed_documents: Embedder, max_batch_size: int = 64, max_wait: float = 0.005):
+        self.embed_documents = embed_documents
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._pending_texts = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight = set()
+
+        # Counters
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self.full_flushes = 0
+        self.timed_flushes = 0
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed ``texts`` as part of the next batch."""
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((list(texts), future))
+        self._pending_texts += len(texts)
+        self.requests += 1
+
+        if self._pending_texts >= self.max_batch_size:
+            self.full_flushes += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush_on_timer)
+        return await future
+
+    def _flush_on_timer(self):
+        self.timed_flushes += 1
+        self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        self._pending_texts = 0
+        if pending:
+            task = asyncio.ensure_future(self._run(pending))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _run(self, pending: List[Tuple[List[str], asyncio.Future]]):
+        texts = [text for request_texts, _ in pending for text in request_texts]
+        chunks = [texts[i:i + self.max_batch_size] for i in range(0, len(texts), self.max_batch_size)]
+        try:
+            results = await asyncio.gather(*(self.embed_documents(chunk) for chunk in chunks))
+        except asyncio.CancelledError:
+            # The flush itself was cancelled (e.g. loop shutdown): so are its callers
+            for _, future in pending:
+                future.cancel()
+            raise
+        except BaseException as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        self.batches += len(chunks)
+        self.texts += len(texts)
+        vectors = [vector for result in results for vector in result]
+        offset = 0
+        for request_texts, future in pending:
+            if not future.done():
+                future.set_result(vectors[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "texts": self.texts,
+            "full_flushes": self.full_flushes,
+            "timed_flushes": self.timed_flushes,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000
+        }
@@ -0,0 +1,210 @@
+import json
+import mmap
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+FILE_TOOL_MAX_READ_BYTES = int(os.getenv("FILE_TOOL_MAX_READ_BYTES", 65536))
+FILE_TOOL_MAX_WRITE_BYTES = int(os.getenv("FILE_TOOL_MAX_WRITE_BYTES", 10 * 1024 * 1024))
+FILE_TOOL_MAX_GREP_BYTES = int(os.getenv("FILE_TOOL_MAX_GREP_BYTES", 64 * 1024 * 1024))
+FILE_TOOL_MAX_GREP_MATCHES = int(os.getenv("FILE_TOOL_MAX_GREP_MATCHES", 1000))
+
+CHUNK_SIZE = 64 * 1024
+GREP_BLOCK_SIZE = 1024 * 1024
+
+READ_DESCRIPTION = (
+    "Read part of a file. Input is a file name, or JSON such as "
+    '{"path": "log.txt", "offset": 0, "length": 4096}, '
+    '{"path": "log.txt", "mode": "head", "lines": 20}, '
+    '{"path": "log.txt", "mode": "tail", "lines": 20} or '
+    '{"path": "log.txt", "mode": "grep", "pattern": "ERROR", "max_matches": 50}'
+)
+WRITE_DESCRIPTION = (
+    'Write to a file. Input is "name:content", or JSON such as '
+    '{"path": "notes.txt", "content": "...", "append": true}'
+)
+
+
+def _parse_args(args: str) -> Optional[Dict[str, Any]]:
+    args = args.strip()
+    if not args.startswith("{"):
+        return None
+    parsed = json.loads(args)
+    if not isinstance(parsed, dict) or "path" not in parsed:
+        raise ValueError("JSON input must be an object with a 'path'")
+    return parsed
+
+
+class FileTools:
+    """Bounded read and write tools for agents.
+
+    Files are confined to the working directory by taking the base name
+    of any path. Reads never return more than ``max_read_bytes`` and never
+    hold the whole file in memory: ranges seek, head streams lines, tail
+    scans back through a read-only mmap and grep streams line-aligned
+    blocks, stopping after ``max_grep_bytes`` scanned or
+    ``max_grep_matches`` matches. Writes take their content from the tool
+    input, which is already in memory, and are refused above
+    ``max_write_bytes``.
+    """
+
+    def __init__(self, max_read_bytes: int = FILE_TOOL_MAX_READ_BYTES,
+                 max_write_bytes: int = FILE_TOOL_MAX_WRITE_BYTES,
+                 max_grep_bytes: int = FILE_TOOL_MAX_GREP_BYTES,
+                 max_grep_matches: int = FILE_TOOL_MAX_GREP_MATCHES):
+        self.max_read_bytes = max_read_bytes
+        self.max_write_bytes = max_write_bytes
+        self.max_grep_bytes = max_grep_bytes
+        self.max_grep_matches = max_grep_matches
+
+    @staticmethod
+    def _safe_path(path: str) -> str:
+        return os.path.basename(str(path).strip())  # Only allow the current directory
+
+    # Reads
+
+    def read(self, args: str) -> str:
+        """Read a range of a file, its head or tail, or the lines matching a pattern."""
+        try:
+            request = _parse_args(args) or {"path": args}
+            path = self._safe_path(request["path"])
+            mode = request.get("mode", "range")
+            size = os.path.getsize(path)
+            if mode == "range":
+                return self._read_range(path, size, int(request.get("offset", 0)), request.get("length"))
+            if mode == "head":
+                return self._read_head(path, int(request.get("lines", 10)))
+            if mode == "tail":
+                return self._read_tail(path, size, int(request.get("lines", 10)))
+            if mode == "grep":
+                return self._grep(path, request["pattern"], int(request.get("max_matches", 100)))
+            return f"Error reading file: unknown mode '{mode}'"
+        except Exception as e:
+            return f"Error reading file: {str(e)}"
+
+    @staticmethod
+    def _decode(data: bytes) -> str:
+        return data.decode("utf-8", errors="replace")
+
+    def _read_range(self, path: str, size: int, offset: int, length: Optional[int]) -> str:
+        offset = max(0, min(offset, size))
+        wanted = size - offset if length is None else max(0, int(length))
+        count = min(wanted, self.max_read_bytes)
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(count)
+        text = self._decode(data)
+        end = offset + len(data)
+        if end < size and len(data) < wanted:
+            text += f"\n[showing bytes {offset}-{end} of {size}; read again with offset {end} to continue]"
+        return text
+
+    def _read_head(self, path: str, lines: int) -> str:
+        output: List[bytes] = []
+        used = 0
+        with open(path, "rb", buffering=CHUNK_SIZE) as f:
+            for _ in range(lines):
+                line = f.readline(self.max_read_bytes - used + 1)
+                if not line:
+                    break
+                output.append(line)
+                used += len(line)
+                if used > self.max_read_bytes:
+                    break
+        return self._cap(b"".join(output))
+
+    def _read_tail(self, path: str, size: int, lines: int) -> str:
+        if size == 0 or lines <= 0:
+            return ""
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Walk back over newlines from the end; a trailing newline ends the last line
+            end = size - 1 if mm[size - 1:size] == b"\n" else size
+            start = end
+            for _ in range(lines):
+                start = mm.rfind(b"\n", 0, start)
+                if start < 0 or size - start > self.max_read_bytes:
+                    break
+            start = start + 1 if start >= 0 else 0
+            start = max(start, size - self.max_read_bytes)
+            return self._decode(mm[start:size])
+
+    def _grep(self, path: str, pattern: str, max_matches: int) -> str:
+        regex = re.compile(pattern.encode("utf-8"), re.MULTILINE)
+        max_matches = min(max_matches, self.max_grep_matches)
+        output: List[str] = []
+        used = 0
+        line_number = 1
+        carry = b""
+        scanned = 0
+        with open(path, "rb") as f:
+            # Scan line-aligned blocks so memory stays bounded by GREP_BLOCK_SIZE
+            while True:
+                chunk = f.read(min(GREP_BLOCK_SIZE, self.max_grep_bytes - scanned))
+                scanned += len(chunk)
+                block = carry + chunk
+                if not chunk:
+                    carry = b""
+                elif b"\n" in chunk:
+                    cut = block.rfind(b"\n") + 1
+                    block, carry = block[:cut], block[cut:]
+                elif len(block) < 4 * GREP_BLOCK_SIZE:
+                    carry = block
+                    continue
+                else:
+                    carry = b""  # Very long line: search it in pieces rather than buffer it whole
+                if not block:
+                    break
+
+                counted_to = 0
+                last_line_start = -1
+                for match in regex.finditer(block):
+                    line_start = block.rfind(b"\n", 0, match.start()) + 1
+                    if line_start == last_line_start:
+                        continue  # One output line per matching line
+                    last_line_start = line_start
+                    line_number += block.count(b"\n", counted_to, line_start)
+                    counted_to = line_start
+                    line_end = block.find(b"\n", match.start())
+                    line = f"{line_number}:{self._decode(block[line_start:line_end if line_end >= 0 else len(block)])}\n"
+                    used += len(line)
+                    if used > self.max_read_bytes or len(output) >= max_matches:
+                        output.append(f"[stopped after {len(output)} matches]\n")
+                        return "".join(output)
+                    output.append(line)
+                line_number += block.count(b"\n", counted_to)
+                if not chunk:
+                    break
+            if scanned >= self.max_grep_bytes and f.read(1):
+                output.append(f"[stopped scanning at byte {scanned} of {os.path.getsize(path)}]\n")
+        return "".join(output)
+
+    def _cap(self, data: bytes) -> str:
+        if len(data) <= self.max_read_bytes:
+            return self._decode(data)
+        return self._decode(data[:self.max_read_bytes]) + f"\n[output truncated at {self.max_read_bytes} bytes]"
+
+    # Writes
+
+    def _write_request(self, args: str) -> Tuple[str, str, bool]:
+        request = _parse_args(args)
+        if request is None:
+            path, content = args.split(':', 1)
+            return path, content, False
+        return request["path"], str(request.get("content", "")), bool(request.get("append", False))
+
+    def write(self, args: str) -> str:
+        """Write or append content to a file."""
+        try:
+            path, content, append = self._write_request(args)
+            safe_path = self._safe_path(path)
+            # UTF-8 needs at least a byte per character, so oversized content is refused unencoded
+            data = content.encode("utf-8") if len(content) <= self.max_write_bytes else None
+            if data is None or len(data) > self.max_write_bytes:
+                size = len(data) if data is not None else f"at least {len(content)}"
+                return f"Error writing file: content is {size} bytes, the limit is {self.max_write_bytes}"
+            with open(safe_path, "ab" if append else "wb") as f:
+                f.write(data)
+            action = "appended to" if append else "wrote to"
+            return f"Successfully {action} {safe_path}"
+        except Exception as e:
+            return f"Error writing file: {str(e)}"
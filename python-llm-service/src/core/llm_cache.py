@@ -0,0 +1,86 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from .cache import LRUCache, SQLiteCache
+
+
+class LLMCache:
+    """Two-tier cache of LLM completions keyed by model parameters and prompt.
+
+    Lookups hit the in-memory LRU tier first and fall back to the SQLite
+    tier, promoting disk hits into memory. Each entry remembers how long the
+    original completion took so saved latency can be reported.
+    """
+
+    def __init__(self, max_entries: int = 1024, path: Optional[str] = None, ttl: float = 86400.0):
+        self.ttl = ttl
+        self.memory = LRUCache(max_entries)
+        self.disk = SQLiteCache(path, table="llm_completions") if path else None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def make_key(model: str, temperature: float, max_tokens: Optional[int], prompt: str) -> str:
+        """Hash the parameters that determine a completion."""
+        payload = json.dumps([model, temperature, max_tokens, prompt], separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _record(self, counter: str, saved: float = 0.0):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self.saved_seconds += saved
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return a cached completion, or None on a miss."""
+        entry = self.memory.get(key)
+        if entry is not None:
+            self._record("memory_hits", entry[1])
+            return entry[0]
+
+        if self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get, key)
+            if entry is not None:
+                completion, latency, seconds_left = entry
+                # Promoted with the time it has left, not a fresh TTL
+                self.memory.put(key, (completion, latency), seconds_left)
+                self._record("disk_hits", latency)
+                return completion
+
+        self._record("misses")
+        return None
+
+    async def put(self, key: str, completion: str, latency: float):
+        """Store a completion along with the time it took to produce."""
+        self.memory.put(key, (completion, latency), self.ttl)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.put, key, completion, latency, self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the LLM time saved by cache hits."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "memory_entries": len(self.memory)
+            }
+
+
+llm_cache = LLMCache(
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024)),
+    path=os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite") or None,
+    ttl=float(os.getenv("LLM_CACHE_TTL", 86400))
+)
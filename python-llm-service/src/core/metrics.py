@@ -0,0 +1,240 @@
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from .profiler import stage
+
+# Request and LLM latencies range from milliseconds (cache hits) to minutes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Return the child for a set of label values, creating it on first use."""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _items(self):
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._items():
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text format.
+
+    Updates take a per-series lock only for the increment itself, so they
+    are safe from any thread and never held across an ``await``.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+agent_requests = registry.counter(
+    "agent_requests_total", "Agent requests by agent type and outcome.", ("agent_type", "status"))
+agent_request_seconds = registry.histogram(
+    "agent_request_duration_seconds", "End-to-end agent request latency.", ("agent_type",))
+agent_requests_in_progress = registry.gauge(
+    "agent_requests_in_progress", "Agent requests currently running.", ("agent_type",))
+
+admission_in_flight = registry.gauge(
+    "admission_in_flight", "Request units admitted and running.")
+admission_queue_depth = registry.gauge(
+    "admission_queue_depth", "Requests waiting for admission.")
+admission_rejected = registry.counter(
+    "admission_rejected_total", "Requests answered with 429 by admission control.", ("reason",))
+admission_wait_seconds = registry.histogram(
+    "admission_wait_seconds", "Time admitted requests waited in the queue.")
+
+coalesced_requests = registry.counter(
+    "coalesced_requests_total", "Requests served by joining an identical request already in flight.",
+    ("agent_type",))
+
+llm_chain_seconds = registry.histogram(
+    "llm_chain_duration_seconds", "LLM chain call latency, including completion cache hits.",
+    ("agent_type", "chain", "cached"))
+llm_chain_errors = registry.counter(
+    "llm_chain_errors_total", "LLM chain calls that raised.", ("agent_type", "chain"))
+llm_tokens = registry.counter(
+    "llm_tokens_total", "Tokens sent to and received from the LLM.", ("agent_type", "chain", "kind"))
+
+tool_calls = registry.counter(
+    "tool_calls_total", "Tool calls by tool and outcome.", ("tool", "status"))
+tool_call_seconds = registry.histogram(
+    "tool_call_duration_seconds", "Tool call latency.", ("tool",))
+
+
+def instrument_tool(name: str, func: Callable[[str], str]) -> Callable[[str], str]:
+    """Wrap a tool function to record its call count, errors and latency."""
+    seconds = tool_call_seconds.labels(name)
+    stage_name = f"tool:{name}"
+
+    @wraps(func)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        status = "error"
+        try:
+            with stage(stage_name):
+                result = func(*args, **kwargs)
+            status = "success"
+            return result
+        finally:
+            seconds.observe(time.perf_counter() - start)
+            tool_calls.labels(name, status).inc()
+
+    return timed
+
+
+def render_metrics() -> str:
+    return registry.render()
@@ -0,0 +1,337 @@
+import glob
+import grp
+import os
+import pwd
+import stat
+import time
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Commands the agents' shell tool may run
+ALLOWED_COMMANDS = ("ls", "pwd", "echo", "cat")
+
+MAX_OUTPUT_BYTES = int(os.getenv("SHELL_TOOL_MAX_OUTPUT_BYTES", 65536))
+
+# Unquoted characters that would need a real shell (pipes, redirection,
+# command substitution, variables, job control)
+SHELL_METACHARACTERS = set(";&|<>()$`\n")
+GLOB_CHARACTERS = set("*?[")
+
+ECHO_ESCAPES = {"a": "\a", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v", "\\": "\\"}
+
+
+class UnsupportedSyntax(Exception):
+    """The command needs shell features the native executor does not provide."""
+
+
+class CommandFailed(Exception):
+    """A command failed; the message is what it would have written to stderr."""
+
+
+def split_command(command: str) -> List[str]:
+    """Split a command line into words the way ``sh`` would for simple commands.
+
+    Handles single and double quotes, backslash escapes, unquoted ``~``
+    and glob expansion. Anything else a shell would interpret raises
+    ``UnsupportedSyntax``.
+    """
+    words: List[str] = []
+    # Each word is built as (literal text, glob pattern with quoted parts escaped)
+    literal: List[str] = []
+    pattern: List[str] = []
+    in_word = has_glob = False
+    i = 0
+
+    def finish():
+        text, pat = "".join(literal), "".join(pattern)
+        if has_glob:
+            matches = sorted(glob.glob(pat))
+            words.extend(matches or [text])
+        else:
+            words.append(text)
+
+    while i < len(command):
+        char = command[i]
+        if char in " \t":
+            if in_word:
+                finish()
+                literal.clear()
+                pattern.clear()
+                in_word = has_glob = False
+            i += 1
+            continue
+        if char in SHELL_METACHARACTERS:
+            raise UnsupportedSyntax(char)
+
+        if char == "'":
+            end = command.find("'", i + 1)
+            if end < 0:
+                raise UnsupportedSyntax("unterminated quote")
+            quoted = command[i + 1:end]
+            literal.append(quoted)
+            pattern.append(glob.escape(quoted))
+            i = end + 1
+        elif char == '"':
+            i += 1
+            quoted: List[str] = []
+            while i < len(command) and command[i] != '"':
+                if command[i] in "$`":
+                    raise UnsupportedSyntax(command[i])
+                if command[i] == "\\" and i + 1 < len(command) and command[i + 1] in '"\\\n':
+                    i += 1
+                quoted.append(command[i])
+                i += 1
+            if i >= len(command):
+                raise UnsupportedSyntax("unterminated quote")
+            literal.append("".join(quoted))
+            pattern.append(glob.escape("".join(quoted)))
+            i += 1
+        elif char == "\\":
+            if i + 1 < len(command):
+                literal.append(command[i + 1])
+                pattern.append(glob.escape(command[i + 1]))
+            i += 2
+        else:
+            if char == "~" and not in_word:
+                end = i + 1
+                while end < len(command) and command[end] not in " \t/":
+                    end += 1
+                home = os.path.expanduser(command[i:end])
+                if not home.startswith("~"):
+                    literal.append(home)
+                    pattern.append(glob.escape(home))
+                    in_word = True
+                    i = end
+                    continue
+            if char in GLOB_CHARACTERS:
+                has_glob = True
+            literal.append(char)
+            pattern.append(char)
+            i += 1
+        in_word = True
+
+    if in_word:
+        finish()
+    return words
+
+
+def _split_flags(args: List[str], allowed: str, command: str) -> Tuple[str, List[str]]:
+    flags = ""
+    operands: List[str] = []
+    for position, arg in enumerate(args):
+        if arg == "--":
+            operands.extend(args[position + 1:])
+            break
+        if arg.startswith("-") and len(arg) > 1 and not operands:
+            for flag in arg[1:]:
+                if flag not in allowed:
+                    raise UnsupportedSyntax(f"{command} -{flag}")
+            flags += arg[1:]
+        else:
+            operands.append(arg)
+    return flags, operands
+
+
+@lru_cache(maxsize=256)
+def _user(uid: int) -> str:
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+
+@lru_cache(maxsize=256)
+def _group(gid: int) -> str:
+    try:
+        return grp.getgrgid(gid).gr_name
+    except KeyError:
+        return str(gid)
+
+
+def _long_row(name: str, path: str, info: os.stat_result, now: float) -> Tuple[str, ...]:
+    # Recent files show the time, others (or future ones) the year
+    recent = now - 180 * 86400 < info.st_mtime <= now + 60
+    date = time.strftime("%b %e %H:%M" if recent else "%b %e  %Y", time.localtime(info.st_mtime))
+    if stat.S_ISLNK(info.st_mode):
+        name = f"{name} -> {os.readlink(path)}"
+    return (stat.filemode(info.st_mode), str(info.st_nlink), _user(info.st_uid),
+            _group(info.st_gid), str(info.st_size), date, name)
+
+
+def _long_listing(entries: List[Tuple[str, str]], with_total: bool, width_paths: List[str] = ()) -> str:
+    """Format ``(name, path)`` pairs like GNU ``ls -l`` in the C locale.
+
+    ``width_paths`` are also measured when aligning columns, the way GNU
+    ls sizes the file section using every command-line operand.
+    """
+    now = time.time()
+    rows = []
+    blocks = 0
+    for name, path in entries:
+        info = os.lstat(path)
+        blocks += (getattr(info, "st_blocks", 0) + 1) // 2
+        rows.append(_long_row(name, path, info, now))
+    measured = rows + [_long_row(path, path, os.stat(path), now) for path in width_paths]
+
+    lines = [f"total {blocks}"] if with_total else []
+    if rows:
+        widths = [max(len(row[column]) for row in measured) for column in range(5)]
+        for mode, links, user, group, size, date, name in rows:
+            lines.append(f"{mode} {links:>{widths[1]}} {user:<{widths[2]}} {group:<{widths[3]}} "
+                         f"{size:>{widths[4]}} {date} {name}")
+    return "".join(f"{line}\n" for line in lines)
+
+
+def _ls(args: List[str], limit: int) -> str:
+    flags, operands = _split_flags(args, "aA1l", "ls")
+    operands = operands or ["."]
+    errors: List[str] = []
+    files: List[str] = []
+    directories: List[str] = []
+    for operand in operands:
+        if not os.path.lexists(operand):
+            errors.append(f"ls: cannot access '{operand}': No such file or directory")
+        elif os.path.isdir(operand):
+            directories.append(operand)
+        else:
+            files.append(operand)
+
+    long_format = "l" in flags
+    sections: List[str] = []
+    if files:
+        if long_format:
+            sections.append(_long_listing([(name, name) for name in sorted(files)], with_total=False,
+                                          width_paths=directories))
+        else:
+            sections.append("".join(f"{name}\n" for name in sorted(files)))
+    for directory in sorted(directories):
+        try:
+            names = [entry.name for entry in os.scandir(directory)]
+        except OSError as e:
+            errors.append(f"ls: cannot open directory '{directory}': {e.strerror}")
+            continue
+        if "a" in flags:
+            names.extend((".", ".."))
+        elif "A" not in flags:
+            names = [name for name in names if not name.startswith(".")]
+        if long_format:
+            listing = _long_listing([(name, os.path.join(directory, name)) for name in sorted(names)], with_total=True)
+        else:
+            listing = "".join(f"{name}\n" for name in sorted(names))
+        if len(operands) > 1:
+            listing = f"{directory}:\n{listing}"
+        sections.append(listing)
+
+    if errors:
+        raise CommandFailed("".join(f"{error}\n" for error in errors))
+    return "\n".join(sections)
+
+
+def _pwd(args: List[str], limit: int) -> str:
+    return os.getcwd() + "\n"
+
+
+def _echo(args: List[str], limit: int) -> str:
+    # Matches POSIX sh (dash) echo: only -n is an option, escapes are always interpreted
+    newline = True
+    if args and args[0] == "-n":
+        newline = False
+        args = args[1:]
+    text = " ".join(args)
+    output: List[str] = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and i + 1 < len(text):
+            escape = text[i + 1]
+            if escape == "c":
+                return "".join(output)
+            if escape == "0":
+                digits = text[i + 2:i + 5]
+                octal = ""
+                for digit in digits:
+                    if digit not in "01234567":
+                        break
+                    octal += digit
+                output.append(chr(int(octal or "0", 8) & 0xFF))
+                i += 2 + len(octal)
+                continue
+            if escape in ECHO_ESCAPES:
+                output.append(ECHO_ESCAPES[escape])
+                i += 2
+                continue
+        output.append(char)
+        i += 1
+    if newline:
+        output.append("\n")
+    return "".join(output)
+
+
+def _cat(args: List[str], limit: int) -> str:
+    _, operands = _split_flags(args, "", "cat")
+    chunks: List[bytes] = []
+    errors: List[str] = []
+    remaining = limit + 1  # Read one byte past the cap so truncation can be detected
+    for operand in operands:
+        try:
+            mode = os.stat(operand).st_mode
+            if stat.S_ISDIR(mode):
+                errors.append(f"cat: {operand}: Is a directory")
+                continue
+            if not stat.S_ISREG(mode):
+                # FIFOs and devices could block or never end
+                errors.append(f"cat: {operand}: not a regular file")
+                continue
+            with open(operand, "rb") as f:
+                while remaining > 0:
+                    chunk = f.read(min(remaining, 65536))
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    remaining -= len(chunk)
+        except OSError as e:
+            errors.append(f"cat: {operand}: {e.strerror}")
+    if errors:
+        raise CommandFailed("".join(f"{error}\n" for error in errors))
+    return b"".join(chunks).decode("utf-8", errors="replace")
+
+
+COMMANDS: Dict[str, Callable[[List[str], int], str]] = {
+    "ls": _ls,
+    "pwd": _pwd,
+    "echo": _echo,
+    "cat": _cat,
+}
+
+
+def _cap(output: str, limit: int) -> str:
+    encoded = output.encode("utf-8")
+    if len(encoded) <= limit:
+        return output
+    return encoded[:limit].decode("utf-8", errors="ignore") + f"\n[output truncated at {limit} bytes]"
+
+
+def run_command(command: str, max_output_bytes: Optional[int] = None) -> str:
+    """Run an allow-listed command in-process and return what the shell tool reports.
+
+    Output matches what ``subprocess.run(command, shell=True)`` would
+    produce: stdout on success, stderr on failure. Nothing is forked, and
+    output is capped at ``max_output_bytes``.
+    """
+    limit = MAX_OUTPUT_BYTES if max_output_bytes is None else max_output_bytes
+    base_command = command.split()[0] if command.split() else ""
+    if base_command not in ALLOWED_COMMANDS:
+        return f"Command '{base_command}' is not allowed for security reasons"
+
+    try:
+        words = split_command(command)
+        if not words or words[0] != base_command:
+            raise UnsupportedSyntax(base_command)
+        output = COMMANDS[base_command](words[1:], limit)
+    except UnsupportedSyntax as e:
+        return f"Command uses shell features that are not supported: {e}"
+    except CommandFailed as e:
+        output = str(e)
+    except Exception as e:
+        return f"Error executing command: {str(e)}"
+    return _cap(output, limit)
@@ -0,0 +1,223 @@
+import asyncio
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".cache/profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", 100))
+PROFILE_TOP_FUNCTIONS = 40
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+# Number of profiled requests in flight; stage() returns immediately while it is zero
+_active = 0
+_active_lock = threading.Lock()
+_NO_STAGE = nullcontext()
+
+
+def new_profile_id() -> str:
+    return uuid.uuid4().hex
+
+
+class _Stage:
+    __slots__ = ("profile", "name", "wall", "cpu", "profiler")
+
+    def __init__(self, profile: "RequestProfile", name: str):
+        self.profile = profile
+        self.name = name
+        self.profiler = None
+
+    def __enter__(self):
+        # Work handed to another thread (agent construction, tool calls) gets
+        # its own profiler, merged into the request's profile at the end.
+        if (self.profile.deterministic and threading.get_ident() != self.profile.thread_id
+                and sys.getprofile() is None):
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.profile.record(self.name, wall, cpu, self.profiler)
+        return False
+
+
+def stage(name: str):
+    """Time a stage of the current request when it is being profiled.
+
+    Stages may nest and repeat; each name accumulates its calls, wall time
+    and CPU time of the thread it ran on. CPU time of a stage that awaits
+    includes whatever else ran on the event loop meanwhile.
+    """
+    if not _active:
+        return _NO_STAGE
+    profile = _current.get()
+    if profile is None:
+        return _NO_STAGE
+    return _Stage(profile, name)
+
+
+class RequestProfile:
+    """Stage timings and an optional cProfile of one request."""
+
+    # cProfile hooks are per thread, so only one request per thread can own one
+    _owners: Dict[int, str] = {}
+    _owners_lock = threading.Lock()
+
+    def __init__(self, profile_id: str, label: Dict[str, Any], deterministic: bool = True):
+        self.id = profile_id
+        self.label = label
+        self.thread_id = threading.get_ident()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.extra_profilers: List[cProfile.Profile] = []
+        self.profiler: Optional[cProfile.Profile] = None
+        self.note: Optional[str] = None
+        self.deterministic = deterministic and self._claim_thread()
+        if deterministic and not self.deterministic:
+            self.note = "cProfile skipped: another profiled request was running on this thread"
+        self._lock = threading.Lock()
+
+    def _claim_thread(self) -> bool:
+        with self._owners_lock:
+            if self.thread_id in self._owners or sys.getprofile() is not None:
+                return False
+            self._owners[self.thread_id] = self.id
+            return True
+
+    def start(self):
+        self.started_at = time.time()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        if self.deterministic:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            with self._owners_lock:
+                self._owners.pop(self.thread_id, None)
+        self.wall = time.perf_counter() - self.wall
+        self.cpu = time.process_time() - self.cpu
+
+    def record(self, name: str, wall: float, cpu: float, profiler: Optional[cProfile.Profile] = None):
+        with self._lock:
+            entry = self.stages.setdefault(name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0})
+            entry["calls"] += 1
+            entry["wall_seconds"] += wall
+            entry["cpu_seconds"] += cpu
+            if profiler is not None:
+                self.extra_profilers.append(profiler)
+
+    def _stats(self) -> Optional[pstats.Stats]:
+        profilers = [p for p in [self.profiler] + self.extra_profilers if p is not None]
+        if not profilers:
+            return None
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        return stats
+
+    def report(self, stats: Optional[pstats.Stats] = None) -> Dict[str, Any]:
+        report: Dict[str, Any] = {
+            "id": self.id,
+            **self.label,
+            "started_at": self.started_at,
+            "wall_seconds": round(self.wall, 6),
+            "process_cpu_seconds": round(self.cpu, 6),
+            "stages": {
+                name: {key: round(value, 6) if isinstance(value, float) else value for key, value in entry.items()}
+                for name, entry in sorted(self.stages.items(), key=lambda item: -item[1]["wall_seconds"])
+            },
+            "cprofile": stats is not None
+        }
+        if self.note:
+            report["note"] = self.note
+        if stats is not None:
+            rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:PROFILE_TOP_FUNCTIONS]
+            report["top_functions"] = [
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "calls": calls,
+                    "total_seconds": round(total, 6),
+                    "cumulative_seconds": round(cumulative, 6)
+                }
+                for (filename, line, name), (_, calls, total, cumulative, _) in rows
+            ]
+        return report
+
+    def save(self, directory: str = PROFILE_DIR) -> Dict[str, Any]:
+        """Write ``<id>.json`` (and ``<id>.prof`` with cProfile data) and return the report."""
+        os.makedirs(directory, exist_ok=True)
+        stats = self._stats()
+        if stats is not None:
+            stats.dump_stats(os.path.join(directory, f"{self.id}.prof"))
+        report = self.report(stats)
+        with open(os.path.join(directory, f"{self.id}.json"), "w") as f:
+            json.dump(report, f, indent=2)
+        _prune(directory)
+        return report
+
+
+def _prune(directory: str, max_files: int = PROFILE_MAX_FILES):
+    reports = [entry for entry in os.scandir(directory) if entry.name.endswith(".json")]
+    if len(reports) <= max_files:
+        return
+    reports.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in reports[:len(reports) - max_files]:
+        for suffix in (".json", ".prof"):
+            try:
+                os.remove(os.path.join(directory, entry.name[:-len(".json")] + suffix))
+            except FileNotFoundError:
+                pass
+
+
+@asynccontextmanager
+async def profiled(profile_id: Optional[str], directory: str = PROFILE_DIR, **label: Any):
+    """Profile the enclosed request when ``profile_id`` is set, writing it on exit.
+
+    The cProfile runs on the thread driving the request, so with the
+    persistent event loop it also sees other requests' work interleaved
+    on that loop; the stage breakdown is per request.
+    """
+    global _active
+    if profile_id is None:
+        yield None
+        return
+
+    profile = RequestProfile(profile_id, label)
+    token = _current.set(profile)
+    with _active_lock:
+        _active += 1
+    profile.start()
+    try:
+        yield profile
+    finally:
+        profile.stop()
+        with _active_lock:
+            _active -= 1
+        _current.reset(token)
+        await asyncio.to_thread(profile.save, directory)
+
+
+def profile_path(profile_id: str, extension: str = "json", directory: str = PROFILE_DIR) -> Optional[str]:
+    """Path of a saved profile artifact, or None for unknown or malformed ids."""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = os.path.join(directory, f"{profile_id}.{extension}")
+    return path if os.path.exists(path) else None
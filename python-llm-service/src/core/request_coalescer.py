@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from .agent_pool import normalize_config
+from .metrics import coalesced_requests
+
+# Request-only config keys that still change the result a request gets back
+RESULT_CONFIG_KEYS = ("semantic_cache", "semantic_cache_threshold")
+
+
+def parse_fields(spec: Optional[str]) -> List[str]:
+    """Parse ``"verbose,apiKeys.serpapi"`` into config field paths."""
+    return [field.strip() for field in (spec or "").split(",") if field.strip()]
+
+
+def _without(config: Dict[str, Any], path: List[str]) -> Dict[str, Any]:
+    head, rest = path[0], path[1:]
+    if head not in config:
+        return config
+    config = dict(config)
+    if not rest:
+        del config[head]
+    elif isinstance(config[head], dict):
+        config[head] = _without(config[head], rest)
+    return config
+
+
+class RequestCoalescer:
+    """Share one run between identical concurrent requests.
+
+    The first request for a key runs; requests with the same key that
+    arrive while it is in flight wait for its result (or exception) instead
+    of running again. The key covers the agent type, input and config,
+    minus request-only keys and the configured ``excluded_fields`` (dotted
+    paths such as ``apiKeys.serpapi``), plus the semantic cache settings
+    and whether the request bypasses caches, so a request never receives
+    a cached answer it opted out of. Results are shared through a
+    ``concurrent.futures.Future`` so waiters on other event loops (the
+    per-request loop mode) can join too.
+    """
+
+    def __init__(self, excluded_fields: Iterable[str] = ()):
+        self.excluded_fields = [field.split(".") for field in excluded_fields]
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        # Counters
+        self.leaders = 0
+        self.followers = 0
+
+    def make_key(self, agent_type: str, user_input: Any, config: Optional[Dict[str, Any]],
+                 bypass_cache: bool = False) -> str:
+        caching = {key: (config or {}).get(key) for key in RESULT_CONFIG_KEYS}
+        caching["bypass_cache"] = bool(bypass_cache)
+        config = normalize_config(config)
+        for path in self.excluded_fields:
+            config = _without(config, path)
+        payload = json.dumps([agent_type, user_input, config, caching], sort_keys=True, separators=(",", ":"),
+                             default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def run(self, agent_type: str, user_input: Any, config: Optional[Dict[str, Any]],
+                  run: Callable[[], Awaitable[Any]], bypass_cache: bool = False) -> Any:
+        """Return ``await run()``, or the result of an identical request already in flight."""
+        key = self.make_key(agent_type, user_input, config, bypass_cache)
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                future.set_running_or_notify_cancel()  # So a waiter's cancellation cannot cancel it
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            coalesced_requests.labels(agent_type).inc()
+            # Shielded so a cancelled waiter leaves the shared future alone
+            return await asyncio.shield(asyncio.wrap_future(future))
+
+        try:
+            result = await run()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.followers,
+                "in_flight": len(self._in_flight),
+                "excluded_fields": [".".join(path) for path in self.excluded_fields]
+            }
+
+
+request_coalescer = RequestCoalescer(parse_fields(os.getenv("COALESCE_EXCLUDED_FIELDS", "verbose")))
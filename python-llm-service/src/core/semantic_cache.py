@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class _Namespace:
+    """Normalized input embeddings and cached results for one agent type/config."""
+
+    def __init__(self, dim: int, capacity: int):
+        self.vectors = np.zeros((min(capacity, 16), dim), dtype=np.float32)
+        self.last_used = np.zeros(len(self.vectors), dtype=np.float64)
+        self.results: List[Any] = []
+        self.inputs: List[str] = []
+        self.capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def slot_for_insert(self) -> Optional[int]:
+        """Return the slot to write, growing the matrix or choosing an LRU victim."""
+        size = len(self.results)
+        if size < len(self.vectors):
+            return None
+        if size < self.capacity:
+            grown = min(self.capacity, len(self.vectors) * 2)
+            self.vectors = np.resize(self.vectors, (grown, self.vectors.shape[1]))
+            self.last_used = np.resize(self.last_used, grown)
+            return None
+        return int(np.argmin(self.last_used))
+
+
+class SemanticCache:
+    """Cache of agent results looked up by embedding similarity of the input.
+
+    Each agent type/config gets its own namespace holding at most
+    ``max_entries`` inputs; the least recently used entry is replaced when a
+    namespace is full and the least recently used namespace is dropped when
+    there are more than ``max_namespaces``.
+    """
+
+    def __init__(self, max_entries: int = 256, max_namespaces: int = 64, threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.max_namespaces = max_namespaces
+        self.threshold = threshold
+        self._namespaces: "OrderedDict[str, _Namespace]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, namespace: str, vector: Sequence[float], threshold: Optional[float] = None) -> Optional[Any]:
+        """Return the cached result of the most similar input above the threshold."""
+        threshold = self.threshold if threshold is None else threshold
+        query = self._normalize(vector)
+        with self._lock:
+            ns = self._namespaces.get(namespace)
+            if ns is None or not len(ns) or ns.vectors.shape[1] != len(query):
+                self.misses += 1
+                return None
+            self._namespaces.move_to_end(namespace)
+
+            similarities = ns.vectors[:len(ns)] @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < threshold:
+                self.misses += 1
+                return None
+            ns.last_used[best] = time.monotonic()
+            self.hits += 1
+            return ns.results[best]
+
+    def store(self, namespace: str, vector: Sequence[float], user_input: str, result: Any):
+        """Remember the result produced for an input."""
+        if self.max_entries <= 0:
+            return
+        vector = self._normalize(vector)
+        with self._lock:
+            ns = self._namespaces.get(namespace)
+            if ns is None or ns.vectors.shape[1] != len(vector):
+                ns = self._namespaces[namespace] = _Namespace(len(vector), self.max_entries)
+            self._namespaces.move_to_end(namespace)
+
+            slot = ns.slot_for_insert()
+            if slot is None:
+                slot = len(ns)
+                ns.results.append(result)
+                ns.inputs.append(user_input)
+            else:
+                ns.results[slot] = result
+                ns.inputs[slot] = user_input
+                self.evictions += 1
+            ns.vectors[slot] = vector
+            ns.last_used[slot] = time.monotonic()
+
+            while len(self._namespaces) > self.max_namespaces:
+                _, dropped = self._namespaces.popitem(last=False)
+                self.evictions += len(dropped)
+
+    def clear(self, namespace: Optional[str] = None):
+        with self._lock:
+            if namespace is None:
+                self._namespaces.clear()
+            else:
+                self._namespaces.pop(namespace, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "namespaces": len(self._namespaces),
+                "entries": sum(len(ns) for ns in self._namespaces.values())
+            }
@@ -0,0 +1,158 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, InvalidStateError
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+
+class KeyedLock:
+    """Async mutual exclusion per key, across event loops.
+
+    Waiters queue in arrival order on ``concurrent.futures.Future`` turns,
+    so requests on other loops (the per-request loop mode) wait without
+    blocking their loop. Keys with no holder take no memory.
+    """
+
+    def __init__(self):
+        self._queues: Dict[str, Deque[Future]] = {}
+        self._lock = threading.Lock()
+
+    def _hand_over(self, key: str):
+        with self._lock:
+            queue = self._queues[key]
+            while queue:
+                try:
+                    queue.popleft().set_result(None)
+                    return
+                except InvalidStateError:
+                    continue  # That waiter was cancelled
+            del self._queues[key]
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[None]:
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue is None:
+                self._queues[key] = deque()
+                turn = None
+            else:
+                turn = Future()
+                queue.append(turn)
+
+        if turn is not None:
+            try:
+                await asyncio.wrap_future(turn)
+            except asyncio.CancelledError:
+                # Cancelled after being handed the lock: pass it on
+                if turn.done() and not turn.cancelled():
+                    self._hand_over(key)
+                raise
+        try:
+            yield
+        finally:
+            self._hand_over(key)
+
+
+class SessionStore:
+    """Per-session agent state held in RAM under a global byte budget.
+
+    States are kept JSON-encoded so their size is known exactly. When the
+    budget is exceeded the least recently used sessions are spilled to
+    ``spill_dir`` and loaded back lazily the next time they are requested.
+    The ``a``-prefixed methods run in a worker thread so spill IO stays off
+    the event loop, and ``locks`` serializes requests for the same session.
+    """
+
+    def __init__(self, budget_bytes: int = 64 * 1024 * 1024, spill_dir: str = ".cache/sessions"):
+        self.budget_bytes = budget_bytes
+        self.spill_dir = spill_dir
+        self._sessions: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.locks = KeyedLock()
+
+        # Counters
+        self.spills = 0
+        self.reloads = 0
+
+    def _spill_path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}.json")
+
+    def _insert(self, key: str, encoded: str):
+        previous = self._sessions.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._sessions[key] = encoded
+        self._bytes += len(encoded)
+
+        # Spill least recently used sessions, but always keep the newest one
+        while self._bytes > self.budget_bytes and len(self._sessions) > 1:
+            old_key, old_encoded = self._sessions.popitem(last=False)
+            self._bytes -= len(old_encoded)
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self._spill_path(old_key), "w") as f:
+                f.write(old_encoded)
+            self.spills += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored state for a session, reloading it from disk if it was spilled."""
+        with self._lock:
+            encoded = self._sessions.get(key)
+            if encoded is not None:
+                self._sessions.move_to_end(key)
+                return json.loads(encoded)
+
+            path = self._spill_path(key)
+            if not os.path.exists(path):
+                return None
+            with open(path) as f:
+                encoded = f.read()
+            os.remove(path)
+            self.reloads += 1
+            self._insert(key, encoded)
+            return json.loads(encoded)
+
+    def put(self, key: str, state: Dict[str, Any]):
+        """Store the state for a session."""
+        encoded = json.dumps(state, separators=(",", ":"), default=str)
+        with self._lock:
+            self._insert(key, encoded)
+            path = self._spill_path(key)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def delete(self, key: str) -> bool:
+        """Forget a session. Returns True if it existed."""
+        with self._lock:
+            encoded = self._sessions.pop(key, None)
+            if encoded is not None:
+                self._bytes -= len(encoded)
+            path = self._spill_path(key)
+            if os.path.exists(path):
+                os.remove(path)
+                return True
+            return encoded is not None
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, state: Dict[str, Any]):
+        await asyncio.to_thread(self.put, key, state)
+
+    async def adelete(self, key: str) -> bool:
+        return await asyncio.to_thread(self.delete, key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions_in_memory": len(self._sessions),
+                "bytes_in_memory": self._bytes,
+                "budget_bytes": self.budget_bytes,
+                "spills": self.spills,
+                "reloads": self.reloads
+            }
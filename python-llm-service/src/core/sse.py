@@ -0,0 +1,61 @@
+import json
+import queue
+from concurrent.futures import Future
+from typing import Any, Dict, Iterator, Optional
+
+from flask import Response
+
+_CLOSED = object()
+
+
+def format_event(event: str, data: Dict[str, Any]) -> str:
+    """Encode one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class EventStream:
+    """Bridge events produced on the event loop to a streaming Flask response.
+
+    ``send`` is thread-safe and is handed to agents as their event sink; the
+    response generator runs in the Flask handler thread and drains the queue.
+    """
+
+    def __init__(self, keepalive: float = 15.0):
+        self.keepalive = keepalive
+        self._queue: "queue.Queue" = queue.Queue()
+
+    def send(self, event: str, data: Dict[str, Any]):
+        self._queue.put((event, data))
+
+    def close(self):
+        self._queue.put(_CLOSED)
+
+    def iter_encoded(self, future: Optional[Future] = None) -> Iterator[str]:
+        """Yield encoded events until the stream is closed.
+
+        If the client disconnects first, the producing future is cancelled.
+        """
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.keepalive)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is _CLOSED:
+                    return
+                yield format_event(*item)
+        finally:
+            if future is not None and not future.done():
+                future.cancel()
+
+    def response(self, future: Optional[Future] = None) -> Response:
+        """Wrap the stream in a ``text/event-stream`` response."""
+        return Response(
+            self.iter_encoded(future),
+            mimetype="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no"
+            }
+        )
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from .cache import LRUCache, SQLiteCache
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse ``"wikipedia=86400,web_search=900"`` into per-tool TTLs."""
+    ttls = {}
+    for item in spec.split(","):
+        name, _, ttl = item.partition("=")
+        if name.strip() and ttl.strip():
+            ttls[name.strip()] = float(ttl)
+    return ttls
+
+
+class ToolCache:
+    """Cache of tool results with per-tool TTLs and in-flight coalescing.
+
+    Results are looked up in an in-memory TTL/LRU tier, then in an optional
+    SQLite tier. Concurrent calls for the same tool and query share one
+    upstream call: the first caller runs it and the others wait on its
+    future. Errors are passed to every waiter and never cached. A TTL of 0
+    disables caching for a tool.
+    """
+
+    def __init__(self, max_entries: int = 1024, path: Optional[str] = None,
+                 default_ttl: float = 3600.0, ttls: Optional[Dict[str, float]] = None):
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self.memory = LRUCache(max_entries)
+        self.disk = SQLiteCache(path, table="tool_results") if path else None
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def ttl_for(self, tool: str) -> float:
+        return self.ttls.get(tool, self.default_ttl)
+
+    @staticmethod
+    def make_key(tool: str, query: str) -> str:
+        payload = json.dumps([tool, query.strip()], separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _record(self, tool: str, counter: str, saved: float = 0.0):
+        with self._lock:
+            stats = self._stats.setdefault(tool, {
+                "memory_hits": 0, "disk_hits": 0, "coalesced": 0, "misses": 0, "errors": 0, "saved_seconds": 0.0
+            })
+            stats[counter] += 1
+            stats["saved_seconds"] += saved
+
+    def _lookup(self, tool: str, key: str) -> Optional[str]:
+        entry = self.memory.get(key)
+        if entry is not None:
+            self._record(tool, "memory_hits", entry[1])
+            return entry[0]
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                result, latency, seconds_left = entry
+                # Promoted with the time it has left, not a fresh TTL
+                self.memory.put(key, (result, latency), seconds_left)
+                self._record(tool, "disk_hits", latency)
+                return result
+        return None
+
+    def call(self, tool: str, func: Callable[[str], str], query: str) -> str:
+        """Return ``func(query)``, served from cache or a concurrent identical call when possible."""
+        ttl = self.ttl_for(tool)
+        if ttl <= 0:
+            return func(query)
+
+        key = self.make_key(tool, query)
+        result = self._lookup(tool, key)
+        if result is not None:
+            return result
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            self._record(tool, "coalesced")
+            return future.result()
+
+        try:
+            # A previous leader may have finished between the lookup and taking the lock
+            entry = self.memory.get(key)
+            if entry is not None:
+                self._record(tool, "memory_hits", entry[1])
+                future.set_result(entry[0])
+                return entry[0]
+
+            start = time.perf_counter()
+            result = str(func(query))
+            latency = time.perf_counter() - start
+        except BaseException as e:
+            self._record(tool, "errors")
+            future.set_exception(e)
+            raise
+        else:
+            self._record(tool, "misses")
+            self.memory.put(key, (result, latency), ttl)
+            if self.disk is not None:
+                self.disk.put(key, result, latency, ttl)
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def wrap(self, tool: str, func: Callable[[str], str]) -> Callable[[str], str]:
+        """Return a cached version of a tool function."""
+        def cached(query: str) -> str:
+            return self.call(tool, func, query)
+        cached.__name__ = getattr(func, "__name__", tool)
+        return cached
+
+    def clear(self):
+        self.memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-tool counters and totals."""
+        with self._lock:
+            tools = {name: dict(stats) for name, stats in self._stats.items()}
+        totals = {"memory_hits": 0, "disk_hits": 0, "coalesced": 0, "misses": 0, "errors": 0, "saved_seconds": 0.0}
+        for stats in tools.values():
+            stats["saved_seconds"] = round(stats["saved_seconds"], 3)
+            for name in totals:
+                totals[name] += stats[name]
+        served = totals["memory_hits"] + totals["disk_hits"] + totals["coalesced"]
+        calls = served + totals["misses"] + totals["errors"]
+        totals["saved_seconds"] = round(totals["saved_seconds"], 3)
+        totals["hit_ratio"] = served / calls if calls else 0.0
+        totals["memory_entries"] = len(self.memory)
+        totals["tools"] = tools
+        return totals
+
+
+tool_cache = ToolCache(
+    max_entries=int(os.getenv("TOOL_CACHE_MAX_ENTRIES", 1024)),
+    path=os.getenv("TOOL_CACHE_PATH") or None,
+    default_ttl=float(os.getenv("TOOL_CACHE_TTL", 3600)),
+    ttls=parse_ttls(os.getenv("TOOL_CACHE_TTLS", "wikipedia=86400,web_search=900"))
+)
@@ -0,0 +1,345 @@
+import asyncio
+import atexit
+import json
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # pragma: no cover - optional dependency
+    hnswlib = None
+
+# (text, metadata, cosine similarity)
+SearchResult = Tuple[str, Dict[str, Any], float]
+
+
+class VectorIndex:
+    """Process-wide vector store shared by every agent, split into namespaces.
+
+    Rows live in one growable matrix of normalized float32 vectors. With a
+    ``path`` the matrix and its row owners are memory-mapped files next to a
+    JSON-lines record log, so the index survives restarts without
+    re-embedding anything. Dropping a namespace only forgets its id; its rows
+    become dead and are compacted away once they outnumber the live ones.
+
+    Small namespaces are searched exactly with NumPy. Namespaces larger than
+    ``brute_force_limit`` use an HNSW graph (when hnswlib is installed)
+    filtered to the namespace's rows.
+    """
+
+    def __init__(self, path: Optional[str] = None, brute_force_limit: int = 2048,
+                 ef: int = 64, M: int = 16, flush_every: int = 256):
+        self.path = path
+        self.brute_force_limit = brute_force_limit
+        self.ef = ef
+        self.M = M
+        self.flush_every = flush_every
+        self._lock = threading.RLock()
+        self._loaded = False
+
+        self._dim: Optional[int] = None
+        self._capacity = 0
+        self._count = 0
+        self._vectors: Optional[np.ndarray] = None
+        self._owners: Optional[np.ndarray] = None
+        self._records: List[Tuple[str, Dict[str, Any]]] = []
+
+        self._namespaces: Dict[str, int] = {}
+        self._members: Dict[int, List[int]] = {}
+        self._next_namespace_id = 0
+        self._dead_rows = 0
+        self._unflushed = 0
+        self._hnsw = None
+
+    # Storage
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _open_array(self, name: str, dtype, shape: Tuple[int, ...], old: Optional[np.ndarray] = None) -> np.ndarray:
+        if not self.path:
+            array = np.zeros(shape, dtype=dtype)
+            if old is not None:
+                array[:len(old)] = old
+            return array
+
+        if isinstance(old, np.memmap):
+            old.flush()
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        mode = "r+b" if os.path.exists(self._file(name)) else "w+b"
+        with open(self._file(name), mode) as f:
+            f.truncate(nbytes)
+        return np.memmap(self._file(name), dtype=dtype, mode="r+", shape=shape)
+
+    def _ensure_capacity(self, dim: int, needed: int):
+        if self._dim is None:
+            self._dim = dim
+        elif dim != self._dim:
+            raise ValueError(f"Vector dimension {dim} does not match index dimension {self._dim}")
+        if needed <= self._capacity and self._vectors is not None:
+            return
+
+        capacity = max(1024, self._capacity)
+        while capacity < needed:
+            capacity *= 2
+        self._vectors = self._open_array("vectors.f32", np.float32, (capacity, dim), self._vectors)
+        self._owners = self._open_array("owners.i32", np.int32, (capacity,), self._owners)
+        self._capacity = capacity
+        if self._hnsw is not None:
+            self._hnsw.resize_index(capacity)
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        if not os.path.exists(self._file("state.json")):
+            return
+
+        with open(self._file("state.json")) as f:
+            state = json.load(f)
+        if state["dim"] is None:
+            return
+        self._ensure_capacity(state["dim"], state["capacity"])
+        self._namespaces = state["namespaces"]
+        self._next_namespace_id = state["next_namespace_id"]
+        self._load_records(state["count"])
+        self._count = len(self._records)
+
+        live = set(self._namespaces.values())
+        for ns_id in live:
+            self._members[ns_id] = []
+        for row, owner in enumerate(self._owners[:self._count].tolist()):
+            if owner in live:
+                self._members[owner].append(row)
+            else:
+                self._dead_rows += 1
+
+        # A shorter log means the graph may hold rows that no longer exist; it is rebuilt on demand
+        if hnswlib is not None and self._count == state["count"] and os.path.exists(self._file("index.hnsw")):
+            self._hnsw = hnswlib.Index(space="ip", dim=self._dim)
+            self._hnsw.load_index(self._file("index.hnsw"), max_elements=self._capacity)
+            self._hnsw.set_ef(self.ef)
+
+    def _load_records(self, count: int):
+        """Read the first ``count`` records and cut the log back to them.
+
+        Records are appended as rows are added but ``count`` only advances
+        on flush, so after an unclean stop the log can run past the state.
+        Those rows were never persisted and would shift every row appended
+        after them, so they are dropped.
+        """
+        if not os.path.exists(self._file("records.jsonl")):
+            return
+        with open(self._file("records.jsonl"), "r+b") as f:
+            end = 0
+            for line in f:
+                if len(self._records) == count or not line.endswith(b"\n"):
+                    break
+                text, metadata = json.loads(line)
+                self._records.append((text, metadata))
+                end += len(line)
+            f.truncate(end)
+
+    def flush(self):
+        """Persist the index state to ``path``."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._loaded:
+                return
+            for array in (self._vectors, self._owners):
+                if isinstance(array, np.memmap):
+                    array.flush()
+            if self._hnsw is not None:
+                self._hnsw.save_index(self._file("index.hnsw"))
+            tmp = self._file("state.json.tmp")
+            with open(tmp, "w") as f:
+                json.dump({
+                    "dim": self._dim,
+                    "capacity": self._capacity,
+                    "count": self._count,
+                    "namespaces": self._namespaces,
+                    "next_namespace_id": self._next_namespace_id
+                }, f)
+            os.replace(tmp, self._file("state.json"))
+            self._unflushed = 0
+
+    def _compact(self):
+        """Rewrite storage keeping only rows owned by live namespaces."""
+        live_rows = sorted(row for rows in self._members.values() for row in rows)
+        vectors = np.array(self._vectors[live_rows])
+        owners = np.array(self._owners[live_rows])
+        records = [self._records[row] for row in live_rows]
+
+        self._vectors = self._owners = None
+        self._capacity = 0
+        if self.path:
+            for name in ("vectors.f32", "owners.i32", "index.hnsw"):
+                if os.path.exists(self._file(name)):
+                    os.remove(self._file(name))
+        self._hnsw = None
+        self._ensure_capacity(self._dim, len(live_rows))
+        self._vectors[:len(live_rows)] = vectors
+        self._owners[:len(live_rows)] = owners
+        self._count = len(live_rows)
+        self._records = records
+        self._dead_rows = 0
+
+        self._members = {ns_id: [] for ns_id in self._namespaces.values()}
+        for row, owner in enumerate(owners.tolist()):
+            self._members[owner].append(row)
+
+        if self.path:
+            with open(self._file("records.jsonl"), "w") as f:
+                for record in records:
+                    f.write(json.dumps(record) + "\n")
+            self.flush()
+
+    # Namespaces
+
+    def drop_namespace(self, namespace: str):
+        """Forget a namespace in O(1); its rows are reclaimed by a later compaction."""
+        with self._lock:
+            self._ensure_loaded()
+            ns_id = self._namespaces.pop(namespace, None)
+            if ns_id is not None:
+                self._dead_rows += len(self._members.pop(ns_id, ()))
+
+    def namespace_size(self, namespace: str) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            ns_id = self._namespaces.get(namespace)
+            return len(self._members.get(ns_id, ())) if ns_id is not None else 0
+
+    # Insert and search
+
+    def add(self, namespace: str, vectors: Sequence[Sequence[float]], texts: Sequence[str],
+            metadatas: Optional[Sequence[Dict[str, Any]]] = None):
+        """Insert a batch of vectors with their texts and metadata."""
+        if not len(texts):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        metadatas = metadatas or [{} for _ in texts]
+
+        with self._lock:
+            self._ensure_loaded()
+            if self._dead_rows > 1024 and self._dead_rows > self._count - self._dead_rows:
+                self._compact()
+
+            ns_id = self._namespaces.get(namespace)
+            if ns_id is None:
+                ns_id = self._namespaces[namespace] = self._next_namespace_id
+                self._next_namespace_id += 1
+                self._members[ns_id] = []
+
+            start = self._count
+            rows = list(range(start, start + len(texts)))
+            self._ensure_capacity(vectors.shape[1], start + len(texts))
+            self._vectors[start:start + len(texts)] = vectors
+            self._owners[start:start + len(texts)] = ns_id
+            self._count += len(texts)
+            self._members[ns_id].extend(rows)
+
+            records = [(text, dict(metadata)) for text, metadata in zip(texts, metadatas)]
+            self._records.extend(records)
+            if self.path:
+                with open(self._file("records.jsonl"), "a") as f:
+                    for record in records:
+                        f.write(json.dumps(record) + "\n")
+
+            if self._hnsw is not None:
+                self._hnsw.add_items(vectors, rows)
+
+            self._unflushed += len(texts)
+            if self._unflushed >= self.flush_every:
+                self.flush()
+
+    def _build_hnsw(self):
+        index = hnswlib.Index(space="ip", dim=self._dim)
+        index.init_index(max_elements=self._capacity, ef_construction=max(self.ef, 100), M=self.M)
+        index.set_ef(self.ef)
+        live_rows = [row for rows in self._members.values() for row in rows]
+        if live_rows:
+            index.add_items(self._vectors[live_rows], live_rows)
+        self._hnsw = index
+
+    def search(self, namespace: str, vector: Sequence[float], k: int = 4) -> List[SearchResult]:
+        """Return the ``k`` most similar entries in a namespace."""
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        with self._lock:
+            self._ensure_loaded()
+            ns_id = self._namespaces.get(namespace)
+            rows = self._members.get(ns_id, []) if ns_id is not None else []
+            k = min(k, len(rows))
+            if not k:
+                return []
+
+            if len(rows) <= self.brute_force_limit or hnswlib is None:
+                scores = self._vectors[rows] @ query
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top])]
+                hits = [(rows[i], float(scores[i])) for i in top]
+            else:
+                if self._hnsw is None:
+                    self._build_hnsw()
+                owners = self._owners
+                labels, distances = self._hnsw.knn_query(
+                    query, k=k, filter=lambda label: owners[label] == ns_id
+                )
+                hits = [(int(label), 1.0 - float(distance)) for label, distance in zip(labels[0], distances[0])]
+
+            return [(self._records[row][0], self._records[row][1], score) for row, score in hits]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._ensure_loaded()
+            return {
+                "rows": self._count,
+                "dead_rows": self._dead_rows,
+                "namespaces": len(self._namespaces),
+                "dim": self._dim,
+                "hnsw": self._hnsw is not None
+            }
+
+
+class IndexNamespace:
+    """One namespace of a VectorIndex, embedding texts with ``embed_documents``.
+
+    Index calls run in a worker thread: they take the index lock and may
+    append to the record log, grow the memory maps or flush, none of which
+    should stall the event loop.
+    """
+
+    def __init__(self, index: VectorIndex, name: str,
+                 embed_documents: Callable[[List[str]], Awaitable[List[List[float]]]]):
+        self.index = index
+        self.name = name
+        self.embed_documents = embed_documents
+
+    async def aadd_texts(self, texts: List[str], metadatas: Optional[List[Dict[str, Any]]] = None):
+        """Embed and insert a batch of texts."""
+        vectors = await self.embed_documents(list(texts))
+        await asyncio.to_thread(self.index.add, self.name, vectors, texts, metadatas)
+
+    async def asimilarity_search(self, query: str, k: int = 4) -> List[SearchResult]:
+        vector = (await self.embed_documents([query]))[0]
+        return await asyncio.to_thread(self.index.search, self.name, vector, k)
+
+    async def adrop(self):
+        await asyncio.to_thread(self.index.drop_namespace, self.name)
+
+
+vector_index = VectorIndex(path=os.getenv("VECTOR_INDEX_PATH", ".cache/vector_index") or None)
+atexit.register(vector_index.flush)
@@ -1,25 +1,42 @@
-from flask import Flask, request, jsonify
-import os
-from src.agents.zerepy_agent import ZerePyAgent
-from src.agents.langchain_agent import LangChainAgent
-from src.agents.babyagi_agent import BabyAGIAgent
-from src.agents.autogpt_agent import AutoGPTAgent
-import asyncio
+import time
+STARTED_AT = time.perf_counter()  # Start of this module's import, for the startup report
+
+from flask import Flask, Response, request, jsonify, make_response, send_file
 from functools import wraps
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+from src.agents.embeddings import batcher_stats, embed_query
+from src.core.admission import AdmissionRejected, admission_controller, tenant_key
+from src.core.agent_pool import AgentPool, pool_key
+from src.core.agent_registry import agent_registry
+from src.core.cassette import llm_cassette
+from src.core.llm_cache import llm_cache
+from src.core.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    agent_request_seconds, agent_requests, agent_requests_in_progress, render_metrics
+)
+from src.core.profiler import new_profile_id, profile_path, profiled, stage
+from src.core.request_coalescer import request_coalescer
+from src.core.semantic_cache import SemanticCache
+from src.core.session_store import SessionStore
+from src.core.tool_cache import tool_cache
+from src.core.async_utils import async_route, run_coroutine, submit_coroutine
+from src.core.sse import EventStream
 from dotenv import load_dotenv
-from src.app import app
 
 load_dotenv()
 
+app = Flask(__name__)
+logger = logging.getLogger(__name__)
+
 # 简单示例：使用LangChain Python
 # 需要先在环境变量里配置 OPENAI_API_KEY
 
-def async_route(f):
-    @wraps(f)
-    def wrapped(*args, **kwargs):
-        return asyncio.run(f(*args, **kwargs))
-    return wrapped
-
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
@@ -27,80 +44,414 @@ def health_check():
         "message": "Python LLM service is healthy"
     })
 
+def build_agent(agent_type, config):
+    """Construct a new agent instance for the pool, importing its module on first use."""
+    return agent_registry.build(agent_type, config)
+
+agent_pool = AgentPool(build_agent, max_size=int(os.getenv("AGENT_POOL_MAX_SIZE", 16)))
+
+# Opt-in cache of results for near-duplicate inputs (config.semantic_cache)
+semantic_cache = SemanticCache(
+    max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 256)),
+    max_namespaces=int(os.getenv("SEMANTIC_CACHE_MAX_NAMESPACES", 64)),
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95))
+)
+
+# Conversation memory for requests that carry a session_id
+session_store = SessionStore(
+    budget_bytes=int(os.getenv("SESSION_MEMORY_BUDGET_BYTES", 64 * 1024 * 1024)),
+    spill_dir=os.getenv("SESSION_SPILL_DIR", ".cache/sessions")
+)
+
+# Coalesce identical concurrent requests unless they opt out (config.coalesce / X-Coalesce)
+COALESCE_REQUESTS = os.getenv("COALESCE_REQUESTS") == "1"
+
+# Limits for /run/batch
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 100))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", 8))
+
+# Header naming the tenant, honored only when set (by a trusted proxy that overwrites it);
+# otherwise tenants are told apart by OpenAI key, then (for admission only) by client address
+ADMISSION_TENANT_HEADER = os.getenv("ADMISSION_TENANT_HEADER", "")
+
+def _tenant_credentials(config):
+    api_keys = config.get("apiKeys") if isinstance(config, dict) else None
+    api_key = api_keys.get("openai") if isinstance(api_keys, dict) else None
+    header_value = request.headers.get(ADMISSION_TENANT_HEADER) if ADMISSION_TENANT_HEADER else None
+    return api_key, header_value
+
+def config_tenant(config):
+    """The tenant sending a request with ``config``, for admission quotas."""
+    api_key, header_value = _tenant_credentials(config)
+    return tenant_key(api_key, header_value, request.remote_addr)
+
+def session_tenant(config):
+    """The tenant owning a request's sessions, or None if the request does not identify one.
+
+    Unlike admission, sessions are never keyed by client address: clients
+    behind one NAT or proxy share it and could read each other's sessions.
+    """
+    api_key, header_value = _tenant_credentials(config)
+    return tenant_key(api_key, header_value) if api_key or header_value else None
+
+def session_tenant_error():
+    message = "session_id requires an OpenAI key in config.apiKeys.openai"
+    if ADMISSION_TENANT_HEADER:
+        message += f" or the {ADMISSION_TENANT_HEADER} header"
+    return message
+
+def request_tenant(data):
+    config = data.get("config") if isinstance(data, dict) else None
+    if not config and isinstance(data, dict) and isinstance(data.get("items"), list) and data["items"]:
+        first = data["items"][0]
+        config = first.get("config") if isinstance(first, dict) else None
+    return config_tenant(config)
+
+def batch_weight(data):
+    """A batch holds as many admission slots as items it can run at once."""
+    items = data.get("items") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return 1
+    try:
+        concurrency = int(data.get("max_concurrency", BATCH_MAX_CONCURRENCY))
+    except (TypeError, ValueError):
+        concurrency = BATCH_MAX_CONCURRENCY
+    return max(1, min(len(items), concurrency, BATCH_MAX_CONCURRENCY))
+
+def admitted(weight=lambda data: 1):
+    """Run the view only once admission control lets the request in; answer 429 otherwise.
+
+    The slot is held until the response is closed, so streamed responses
+    keep it for as long as they stream.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            if not admission_controller.enabled:
+                return f(*args, **kwargs)
+            data = request.get_json(silent=True)
+            try:
+                ticket = admission_controller.acquire(request_tenant(data), weight(data))
+            except AdmissionRejected as e:
+                response = jsonify({
+                    "status": "error",
+                    "message": f"Service is at capacity ({e.reason}), retry after {e.retry_after}s",
+                    "reason": e.reason
+                })
+                response.status_code = 429
+                response.headers["Retry-After"] = str(e.retry_after)
+                return response
+            try:
+                response = make_response(f(*args, **kwargs))
+            except BaseException:
+                ticket.release()
+                raise
+            response.call_on_close(ticket.release)
+            return response
+        return wrapped
+    return decorator
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    return jsonify({
+        "agent_pool": agent_pool.stats(),
+        "llm_cache": llm_cache.stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "sessions": session_store.stats(),
+        "vector_index": vector_index_stats(),
+        "embedding_batcher": batcher_stats(),
+        "tool_cache": tool_cache.stats(),
+        "llm_cassette": llm_cassette.stats() if llm_cassette is not None else {"mode": None},
+        "coalescing": request_coalescer.stats(),
+        "admission": admission_controller.stats(),
+        "startup": startup_report()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Request, LLM chain and tool metrics in the Prometheus text format."""
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """A saved request profile: the JSON report, or the raw cProfile data with ?format=pstats."""
+    raw = request.args.get("format") == "pstats"
+    path = profile_path(profile_id, "prof" if raw else "json")
+    if path is None:
+        return jsonify({"status": "error", "message": f"Profile not found: {profile_id}"}), 404
+    if raw:
+        return send_file(os.path.abspath(path), mimetype="application/octet-stream",
+                         as_attachment=True, download_name=f"{profile_id}.prof")
+    return send_file(os.path.abspath(path), mimetype="application/json")
+
+def vector_index_stats():
+    # The shared index is only imported by agents that use it (BabyAGI)
+    module = sys.modules.get("src.core.vector_index")
+    return module.vector_index.stats() if module else {"loaded": False}
+
+def startup_report():
+    """Module import time, warmup time and per-agent import/construct times."""
+    return {
+        "app_import_seconds": round(STARTUP_SECONDS, 4),
+        "warmup_seconds": round(WARMUP_SECONDS, 4) if WARMUP_SECONDS is not None else None,
+        "enabled_agents": agent_registry.enabled,
+        "agents": agent_registry.report()
+    }
+
+def success_payload(agent_type, user_input, result, session_id=None, profile_id=None):
+    payload = {
+        "status": "success",
+        "message": f"{agent_registry.label(agent_type)} agent executed successfully",
+        "result": result,
+        "agent_type": agent_type,
+        "input": user_input
+    }
+    if session_id is not None:
+        payload["session_id"] = session_id
+    if profile_id is not None:
+        payload["profile_id"] = profile_id
+    return payload
+
+def error_payload(agent_type, user_input, message, profile_id=None):
+    payload = {
+        "status": "error",
+        "message": message,
+        "agent_type": agent_type,
+        "input": user_input
+    }
+    if profile_id is not None:
+        payload["profile_id"] = profile_id
+    return payload
+
+def cache_bypassed(config):
+    """Whether this request asked to skip cached results."""
+    return bool(config.get("cache_bypass")) or request.headers.get("X-Cache-Bypass") == "1"
+
+def coalescing_requested(config):
+    """Whether this request may share the result of an identical one in flight."""
+    if "coalesce" in config:
+        return bool(config["coalesce"])
+    header = request.headers.get("X-Coalesce")
+    return header == "1" if header is not None else COALESCE_REQUESTS
+
+def profile_requested(config):
+    """A new profile id if this request asked to be profiled, else None."""
+    wanted = bool(config.get("profile")) or request.headers.get("X-Profile") == "1"
+    return new_profile_id() if wanted else None
+
+def session_key(tenant, agent_type, session_id):
+    """Sessions are scoped by tenant, so one tenant cannot read another's by guessing its id."""
+    return f"{tenant}:{agent_type}:{session_id}"
+
+async def execute_agent(agent_type, user_input, config, event_sink=None, bypass_cache=False, session_id=None,
+                        profile_id=None, coalesce=False, tenant=None):
+    """Run one request on a pooled agent, optionally streaming its progress events.
+
+    With ``config.semantic_cache`` set, a result cached for a sufficiently
+    similar input to the same agent type and config is returned instead of
+    running the agent. With a ``session_id``, the agent's memory is restored
+    from the ``tenant``'s session store entry before running and saved back
+    afterwards, one request per session at a time; see ``session_tenant``.
+    Request counts, outcomes and latency are recorded per agent type. With
+    a ``profile_id`` the request is profiled and its report saved under
+    that id. With ``coalesce``, a request identical to one already running
+    waits for and shares its result; session, streaming and profiled
+    requests always run on their own.
+    """
+    in_progress = agent_requests_in_progress.labels(agent_type)
+    in_progress.inc()
+    start = time.perf_counter()
+    status = "error"
+    try:
+        if coalesce and session_id is None and event_sink is None and profile_id is None:
+            result = await request_coalescer.run(
+                agent_type, user_input, config,
+                lambda: _execute_agent(agent_type, user_input, config, None, bypass_cache, None),
+                bypass_cache=bypass_cache
+            )
+        else:
+            async with profiled(profile_id, agent_type=agent_type, session_id=session_id):
+                if session_id is not None:
+                    key = session_key(tenant, agent_type, session_id)
+                    async with session_store.locks.hold(key):
+                        result = await _execute_agent(agent_type, user_input, config, event_sink, bypass_cache, key)
+                else:
+                    result = await _execute_agent(agent_type, user_input, config, event_sink, bypass_cache, None)
+        if not (isinstance(result, dict) and "error" in result):
+            status = "success"
+        return result
+    finally:
+        in_progress.dec()
+        agent_request_seconds.labels(agent_type).observe(time.perf_counter() - start)
+        agent_requests.labels(agent_type, status).inc()
+
+async def _execute_agent(agent_type, user_input, config, event_sink, bypass_cache, session):
+    use_semantic_cache = bool(config.get("semantic_cache")) and bool(user_input) and session is None
+    if use_semantic_cache:
+        namespace = pool_key(agent_type, config)
+        with stage("embed_query"):
+            vector = await embed_query(user_input, config)
+        if not bypass_cache:
+            cached = semantic_cache.lookup(namespace, vector, config.get("semantic_cache_threshold"))
+            if cached is not None:
+                return cached
+
+    async with agent_pool.lease(agent_type, config) as agent:
+        if event_sink is not None:
+            agent.attach_event_sink(event_sink)
+        if session is not None:
+            state = await session_store.aget(session)
+            if state:
+                agent.load_session_state(state)
+
+        with stage("execute"):
+            result = await agent.execute(user_input)
+
+        if session is not None:
+            await session_store.aput(session, agent.export_session_state())
+
+    if use_semantic_cache and "error" not in result:
+        semantic_cache.store(namespace, vector, user_input, result)
+    return result
+
+def stream_agent(agent_type, user_input, config, session_id=None):
+    """Run an agent in the background and stream its events as server-sent events."""
+    stream = EventStream()
+    stream.send("start", {"agent_type": agent_type, "input": user_input})
+    bypass_cache = cache_bypassed(config)
+    profile_id = profile_requested(config)
+    tenant = session_tenant(config)
+
+    async def job():
+        try:
+            result = await execute_agent(
+                agent_type, user_input, config,
+                event_sink=stream.send,
+                bypass_cache=bypass_cache,
+                session_id=session_id,
+                profile_id=profile_id,
+                tenant=tenant
+            )
+            stream.send("result", success_payload(agent_type, user_input, result, session_id, profile_id))
+        except Exception as e:
+            stream.send("error", error_payload(agent_type, user_input, str(e), profile_id))
+        finally:
+            stream.close()
+
+    return stream.response(submit_coroutine(job()))
+
+def wants_event_stream():
+    return request.accept_mimetypes.best_match(
+        ["application/json", "text/event-stream"]
+    ) == "text/event-stream"
+
 @app.route('/run', methods=['POST'])
+@admitted()
 @async_route
 async def run_agent():
     data = request.json
     agent_type = data.get("agent_type", "langchain")
     user_input = data.get("input", "")
     config = data.get("config", {})
+    session_id = data.get("session_id")
+
+    if agent_type not in agent_registry:
+        return jsonify(error_payload(agent_type, user_input, f"Unsupported agent type: {agent_type}")), 400
+    if session_id is not None and session_tenant(config) is None:
+        return jsonify(error_payload(agent_type, user_input, session_tenant_error())), 400
 
+    if wants_event_stream():
+        return stream_agent(agent_type, user_input, config, session_id)
+
+    profile_id = profile_requested(config)
     try:
-        if agent_type == "zerepy":
-            agent = ZerePyAgent(config)
-            result = await agent.execute(user_input)
-            return jsonify({
-                "status": "success",
-                "message": "ZerePy agent executed successfully",
-                "result": result,
-                "agent_type": agent_type,
-                "input": user_input
-            })
-        
-        elif agent_type == "langchain":
-            agent = LangChainAgent(config)
-            result = await agent.execute(user_input)
-            return jsonify({
-                "status": "success",
-                "message": "LangChain agent executed successfully",
-                "result": result,
-                "agent_type": agent_type,
-                "input": user_input
-            })
-            
-        elif agent_type == "babyagi":
-            agent = BabyAGIAgent(config)
-            try:
-                result = await agent.execute(user_input)
-                return jsonify({
-                    "status": "success",
-                    "message": "BabyAGI agent executed successfully",
-                    "result": result,
-                    "agent_type": agent_type,
-                    "input": user_input
-                })
-            finally:
-                await agent.cleanup()
-                
-        elif agent_type == "autogpt":
-            agent = AutoGPTAgent(config)
-            try:
-                result = await agent.execute(user_input)
-                return jsonify({
-                    "status": "success",
-                    "message": "AutoGPT agent executed successfully",
-                    "result": result,
-                    "agent_type": agent_type,
-                    "input": user_input
-                })
-            finally:
-                await agent.cleanup()
-        
-        else:
-            return jsonify({
-                "status": "error",
-                "message": f"Unsupported agent type: {agent_type}",
-                "agent_type": agent_type,
-                "input": user_input
-            }), 400
+        result = await execute_agent(
+            agent_type, user_input, config,
+            bypass_cache=cache_bypassed(config),
+            session_id=session_id,
+            profile_id=profile_id,
+            coalesce=coalescing_requested(config),
+            tenant=session_tenant(config)
+        )
+        return jsonify(success_payload(agent_type, user_input, result, session_id, profile_id))
 
     except Exception as e:
+        return jsonify(error_payload(agent_type, user_input, str(e), profile_id)), 500
+
+@app.route('/run/stream', methods=['POST'])
+@admitted()
+def run_agent_stream():
+    data = request.json
+    agent_type = data.get("agent_type", "langchain")
+    user_input = data.get("input", "")
+    config = data.get("config", {})
+    session_id = data.get("session_id")
+
+    if agent_type not in agent_registry:
+        return jsonify(error_payload(agent_type, user_input, f"Unsupported agent type: {agent_type}")), 400
+    if session_id is not None and session_tenant(config) is None:
+        return jsonify(error_payload(agent_type, user_input, session_tenant_error())), 400
+
+    return stream_agent(agent_type, user_input, config, session_id)
+
+@app.route('/run/batch', methods=['POST'])
+@admitted(batch_weight)
+@async_route
+async def run_batch():
+    data = request.json
+    items = data.get("items", [])
+
+    if not isinstance(items, list):
+        return jsonify({"status": "error", "message": "items must be a list"}), 400
+    if len(items) > BATCH_MAX_ITEMS:
         return jsonify({
             "status": "error",
-            "message": str(e),
-            "agent_type": agent_type,
-            "input": user_input
-        }), 500
+            "message": f"Batch too large: {len(items)} items (max {BATCH_MAX_ITEMS})"
+        }), 400
+
+    try:
+        concurrency = int(data.get("max_concurrency", BATCH_MAX_CONCURRENCY))
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "max_concurrency must be an integer"}), 400
+    semaphore = asyncio.Semaphore(max(1, min(concurrency, BATCH_MAX_CONCURRENCY)))
+
+    async def run_item(item):
+        if not isinstance(item, dict):
+            return error_payload(None, None, "Batch items must be objects")
+
+        agent_type = item.get("agent_type", "langchain")
+        user_input = item.get("input", "")
+        config = item.get("config", {})
+        session_id = item.get("session_id")
+
+        if agent_type not in agent_registry:
+            return error_payload(agent_type, user_input, f"Unsupported agent type: {agent_type}")
+        if session_id is not None and session_tenant(config) is None:
+            return error_payload(agent_type, user_input, session_tenant_error())
+
+        # Items run on pooled agents, one instance per running item, so a
+        # config shared by many items builds at most max_concurrency agents;
+        # later items reuse the instances released by the ones before them.
+        profile_id = profile_requested(config)
+        async with semaphore:
+            try:
+                result = await execute_agent(
+                    agent_type, user_input, config,
+                    bypass_cache=cache_bypassed(config),
+                    session_id=session_id,
+                    profile_id=profile_id,
+                    coalesce=coalescing_requested(config),
+                    tenant=session_tenant(config)
+                )
+            except Exception as e:
+                return error_payload(agent_type, user_input, str(e), profile_id)
+        return success_payload(agent_type, user_input, result, session_id, profile_id)
+
+    results = await asyncio.gather(*(run_item(item) for item in items))
+    return jsonify({
+        "status": "success",
+        "results": results
+    })
 
 @app.route('/clear-memory', methods=['POST'])
 @async_route
@@ -108,21 +459,29 @@ async def clear_memory():
     data = request.json
     agent_type = data.get("agent_type", "langchain")
     config = data.get("config", {})
+    session_id = data.get("session_id")
 
     try:
-        if agent_type == "zerepy":
-            agent = ZerePyAgent(config)
-            await agent.memory.clear()
-        elif agent_type == "langchain":
-            agent = LangChainAgent(config)
-            await agent.clear_memory()
-        elif agent_type == "babyagi":
-            agent = BabyAGIAgent(config)
-            await agent.cleanup()
-        elif agent_type == "autogpt":
-            agent = AutoGPTAgent(config)
-            await agent.cleanup()
-        
+        if session_id is not None:
+            tenant = session_tenant(config)
+            if tenant is None:
+                return jsonify({
+                    "status": "error",
+                    "message": session_tenant_error(),
+                    "agent_type": agent_type
+                }), 400
+            await session_store.adelete(session_key(tenant, agent_type, session_id))
+            return jsonify({
+                "status": "success",
+                "message": "Memory cleared successfully",
+                "agent_type": agent_type,
+                "session_id": session_id
+            })
+
+        # Pooled agents are reset on checkin, so dropping the idle instances
+        # for this config is all that is left to clear.
+        agent_pool.clear(agent_type, config)
+
         return jsonify({
             "status": "success",
             "message": "Memory cleared successfully",
@@ -136,6 +495,64 @@ async def clear_memory():
             "agent_type": agent_type
         }), 500
 
+def warmup_configs(value):
+    """Parse ``WARMUP_CONFIG``: a JSON object mapping agent types to a config or a list of configs."""
+    configs = json.loads(value) if value and value.strip() else {}
+    if not isinstance(configs, dict):
+        raise ValueError("WARMUP_CONFIG must be a JSON object keyed by agent type")
+    return {
+        agent_type: entry if isinstance(entry, list) else [entry]
+        for agent_type, entry in configs.items()
+    }
+
+WARMUP_CONFIGS = warmup_configs(os.getenv("WARMUP_CONFIG"))
+
+async def prime_agent(agent_type, config):
+    key, agent = await agent_pool.checkout(agent_type, config)
+    await agent_pool.checkin(key, agent)
+
+def warmup_agents():
+    """Import every enabled agent and park warm instances in the pool.
+
+    Instances are built for each config listed for the agent type in
+    ``WARMUP_CONFIG``; the pool only hands them to requests with the same
+    config (minus request-only keys). Types without configs get one with
+    the empty config, which mainly warms imports and one-time setup.
+    """
+    global WARMUP_SECONDS
+    start = time.perf_counter()
+    agent_registry.preload()
+    for agent_type in agent_registry.enabled:
+        for config in WARMUP_CONFIGS.get(agent_type, [{}]):
+            try:
+                run_coroutine(prime_agent(agent_type, config))
+            except Exception:
+                logger.exception("Warmup could not construct %s", agent_type)
+    WARMUP_SECONDS = time.perf_counter() - start
+
+# With an allow-list, import those agents now so the first request does not pay for it
+if os.getenv("ENABLED_AGENTS"):
+    agent_registry.preload()
+
+WARMUP_SECONDS = None
+STARTUP_SECONDS = time.perf_counter() - STARTED_AT
+
+if os.getenv("AGENT_WARMUP") == "1":
+    warmup_agents()
+
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Python LLM service")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Import and construct every enabled agent before serving")
+    args = parser.parse_args()
+    if args.warmup and os.getenv("AGENT_WARMUP") != "1":
+        warmup_agents()
+    logger.info("Startup: %s", json.dumps(startup_report()))
+
+    # Exit through SystemExit on SIGTERM (docker stop), so atexit handlers such as
+    # the vector index flush still run
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
     port = int(os.getenv('PORT', 5001))
     app.run(host='0.0.0.0', port=port)
\ No newline at end of file
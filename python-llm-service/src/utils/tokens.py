@@ -0,0 +1,45 @@
+from functools import lru_cache
+from typing import Any, Optional
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model_name: str) -> Optional[Any]:
+    """Return the tiktoken encoding for a model, or None if it cannot be loaded."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The BPE files are fetched on first use and may be unavailable offline
+        return None
+
+
+def count_tokens(text: str, model_name: str = "gpt-3.5-turbo") -> int:
+    """Count the tokens in ``text``, estimating ~4 characters per token without tiktoken."""
+    if not text:
+        return 0
+    encoding = get_encoding(model_name)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model_name: str = "gpt-3.5-turbo") -> str:
+    """Cut ``text`` down to at most ``max_tokens`` tokens."""
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoding(model_name)
+    if encoding is None:
+        return text[:max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
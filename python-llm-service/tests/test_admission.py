@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from src.core.admission import AdmissionController, AdmissionRejected, tenant_key
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def start_waiter(controller, order, name, weight=1, tenant="anonymous"):
+    """Acquire from a thread, recording ``name`` (or the rejection) in ``order``; returns the thread."""
+    def run():
+        try:
+            ticket = controller.acquire(tenant, weight)
+        except AdmissionRejected as e:
+            order.append(f"{name}:{e.reason}")
+            return
+        order.append(name)
+        ticket.release()
+
+    queued = controller.stats()["queued"]
+    thread = threading.Thread(target=run)
+    thread.start()
+    wait_until(lambda: controller.stats()["queued"] > queued or name in order)
+    return thread
+
+
+def test_tenant_key():
+    assert tenant_key("sk-a", "acme") == "header:acme"
+    assert tenant_key("sk-a", None, "10.0.0.1") == tenant_key("sk-a")
+    assert tenant_key("sk-a") != tenant_key("sk-b")
+    assert "sk-a" not in tenant_key("sk-a")
+    assert tenant_key(None, None, "10.0.0.1") == "addr:10.0.0.1"
+    assert tenant_key(None) == "anonymous"
+
+
+def test_slots_are_counted_and_released_once():
+    controller = AdmissionController(max_in_flight=3, max_queue=0)
+    first = controller.acquire("a")
+    batch = controller.acquire("b", weight=2)
+    assert controller.stats()["in_flight"] == 3
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire("c")
+    assert rejected.value.reason == "queue_full"
+    assert rejected.value.retry_after >= 1
+
+    batch.release()
+    batch.release()
+    first.release()
+    stats = controller.stats()
+    assert (stats["in_flight"], stats["tenants"], stats["admitted"]) == (0, 0, 2)
+    assert stats["rejected"] == {"queue_full": 1}
+
+
+def test_weight_is_capped_at_capacity():
+    controller = AdmissionController(max_in_flight=2)
+    ticket = controller.acquire(weight=10)
+    assert ticket.weight == 2
+    ticket.release()
+
+
+def test_queued_requests_are_admitted_in_arrival_order():
+    controller = AdmissionController(max_in_flight=2, max_queue=10, queue_timeout=5)
+    held = controller.acquire()
+    order = []
+    threads = [start_waiter(controller, order, "batch", weight=2)]
+    # A light request fits next to the held slot but must not overtake the batch
+    threads += [start_waiter(controller, order, f"small{i}") for i in range(2)]
+    assert controller.stats()["queued"] == 3
+
+    held.release()
+    for thread in threads:
+        thread.join()
+    # Both small requests are admitted together once the batch is done
+    assert order[0] == "batch" and sorted(order[1:]) == ["small0", "small1"]
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_queue_timeout_lets_the_requests_behind_in():
+    controller = AdmissionController(max_in_flight=2, max_queue=10, queue_timeout=0.1)
+    held = controller.acquire()
+    order = []
+    batch = start_waiter(controller, order, "batch", weight=2)
+    controller.queue_timeout = 5
+    small = start_waiter(controller, order, "small")
+
+    batch.join()
+    small.join()
+    assert order == ["batch:queue_timeout", "small"]
+    held.release()
+    stats = controller.stats()
+    assert (stats["in_flight"], stats["queued"], stats["tenants"]) == (0, 0, 0)
+
+
+def test_tenant_quota_counts_running_and_queued_requests():
+    controller = AdmissionController(max_in_flight=1, max_queue=10, queue_timeout=5, tenant_max=2)
+    held = controller.acquire("a")
+    order = []
+    queued = start_waiter(controller, order, "queued", tenant="a")
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire("a")
+    assert rejected.value.reason == "tenant_quota"
+
+    other = start_waiter(controller, order, "other", tenant="b")
+    held.release()
+    queued.join()
+    other.join()
+    assert order == ["queued", "other"]
+    assert controller.stats()["tenants"] == 0
+
+
+def test_disabled_controller_admits_everything():
+    controller = AdmissionController(max_in_flight=0)
+    tickets = [controller.acquire() for _ in range(100)]
+    for ticket in tickets:
+        ticket.release()
+    assert controller.stats()["in_flight"] == 0
@@ -0,0 +1,21 @@
+import numpy as np
+
+from src.agents.affect_lexicon import AffectLexicon
+
+
+def test_score_many_matches_score():
+    lexicon = AffectLexicon.default()
+    texts = ["happy happy calm", "I will maybe be sad", "", "nothing here"]
+    expected = np.array([lexicon.score(text) for text in texts])
+    assert np.allclose(lexicon.scoreMany(texts), expected)
+
+
+def test_score_many_with_vocab_skipping_rows():
+    # More weight rows than words: packing pairs by vocab size would mix texts up
+    weights = np.zeros((10, 3), dtype=np.float32)
+    weights[9] = (1.0, 0.0, 0.0)
+    weights[1] = (0.0, 1.0, 0.0)
+    lexicon = AffectLexicon({"joy": 9, "calm": 1}, weights)
+    texts = ["joy joy", "calm", "joy calm"]
+    expected = np.array([lexicon.score(text) for text in texts])
+    assert np.allclose(lexicon.scoreMany(texts), expected)
@@ -0,0 +1,80 @@
+import asyncio
+
+from src.core.agent_pool import AgentPool, normalize_config, pool_key
+
+
+class FakeAgent:
+    def __init__(self, agent_type, config):
+        self.agent_type = agent_type
+        self.config = config
+        self.resets = 0
+
+    async def reset(self):
+        self.resets += 1
+
+
+def test_request_only_keys_and_unset_values_do_not_change_the_key():
+    base = {"model_name": "gpt-3.5-turbo", "apiKeys": {"openai": "sk-a"}}
+    assert pool_key("babyagi", base) == pool_key("babyagi", dict(
+        base, semantic_cache=True, semantic_cache_threshold=0.9, cache_bypass=True, profile=True, coalesce=False,
+        temperature=None
+    ))
+    assert normalize_config({"apiKeys": {"openai": "sk-a", "serpapi": None}}) == {"apiKeys": {"openai": "sk-a"}}
+    assert pool_key("babyagi", None) == pool_key("babyagi", {})
+
+
+def test_key_depends_on_agent_type_and_construction_config():
+    assert pool_key("babyagi", {}) != pool_key("autogpt", {})
+    assert pool_key("babyagi", {"temperature": 0}) != pool_key("babyagi", {"temperature": 0.7})
+    assert pool_key("babyagi", {"apiKeys": {"openai": "sk-a"}}) != pool_key("babyagi", {"apiKeys": {"openai": "sk-b"}})
+    assert pool_key("babyagi", {"a": 1, "b": 2}) == pool_key("babyagi", {"b": 2, "a": 1})
+
+
+def test_pool_reuses_and_resets_agents_per_key():
+    pool = AgentPool(FakeAgent, max_size=4)
+
+    async def scenario():
+        async with pool.lease("babyagi", {"temperature": 0}) as first:
+            pass
+        async with pool.lease("babyagi", {"temperature": 0, "profile": True}) as second:
+            pass
+        async with pool.lease("babyagi", {"temperature": 1}) as third:
+            pass
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert first is second
+    assert first.resets == 2
+    assert third is not first
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"], stats["idle"], stats["checked_out"]) == (1, 2, 2, 0)
+
+
+def test_agents_whose_request_raised_are_not_reused():
+    pool = AgentPool(FakeAgent, max_size=4)
+
+    async def scenario():
+        try:
+            async with pool.lease("babyagi", {}):
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+    asyncio.run(scenario())
+    assert pool.stats()["idle"] == 0
+    assert pool.stats()["checked_out"] == 0
+
+
+def test_idle_agents_are_bounded_with_lru_eviction():
+    pool = AgentPool(FakeAgent, max_size=2)
+
+    async def scenario():
+        for temperature in (0, 1, 2):
+            async with pool.lease("babyagi", {"temperature": temperature}):
+                pass
+
+    asyncio.run(scenario())
+    stats = pool.stats()
+    assert (stats["idle"], stats["evictions"]) == (2, 1)
+    assert pool.clear("babyagi", {"temperature": 0}) == 0
+    assert pool.clear("babyagi", {"temperature": 2}) == 1
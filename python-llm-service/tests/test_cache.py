@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from src.core.cache import SQLiteCache
+from src.core.llm_cache import LLMCache
+from src.core.tool_cache import ToolCache
+
+
+def row_count(cache):
+    with cache._lock:
+        return cache._connection().execute(f"SELECT COUNT(*) FROM {cache.table}").fetchone()[0]
+
+
+def test_expired_rows_are_purged_on_open(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SQLiteCache(path)
+    cache.put("stale", "v", ttl=0.01)
+    cache.put("forever", "v")
+    cache.close()
+    time.sleep(0.02)
+    assert row_count(SQLiteCache(path)) == 1
+
+
+def test_expired_rows_are_purged_periodically_on_write(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), purge_interval=0.05)
+    for i in range(5):
+        cache.put(f"stale{i}", "v", ttl=0.01)
+    time.sleep(0.06)
+    cache.put("fresh", "v", ttl=60)
+    assert row_count(cache) == 1
+
+
+def test_get_reports_the_time_left(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"))
+    cache.put("a", "value", cost=1.5, ttl=100)
+    cache.put("b", "value")
+    value, cost, seconds_left = cache.get("a")
+    assert (value, cost) == ("value", 1.5)
+    assert 99 < seconds_left <= 100
+    assert cache.get("b")[2] is None
+
+
+def test_disk_hits_keep_their_remaining_ttl(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    writer = LLMCache(path=path, ttl=0.2)
+    asyncio.run(writer.put("k", "completion", 1.0))
+    time.sleep(0.1)
+
+    reader = LLMCache(path=path, ttl=0.2)
+    assert asyncio.run(reader.get("k")) == "completion"
+    time.sleep(0.15)
+    # Promoted for the ~0.1s left on disk, not a fresh 0.2s
+    assert reader.memory.get("k") is None
+
+    tools = ToolCache(path=str(tmp_path / "tools.sqlite"), default_ttl=0.2)
+    tools.call("wiki", str.upper, "q")
+    time.sleep(0.1)
+    tools.memory.clear()
+    assert tools.call("wiki", lambda q: "fresh", "q") == "Q"
+    time.sleep(0.15)
+    assert tools.memory.get(ToolCache.make_key("wiki", "q")) is None
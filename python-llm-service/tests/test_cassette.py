@@ -0,0 +1,85 @@
+import pytest
+
+from src.core.cassette import Cassette, CassetteMiss, decode_vectors, encode_vectors, parse_latency
+
+
+def test_parse_latency():
+    assert parse_latency("original") == 1.0
+    assert parse_latency("zero") == 0.0
+    assert parse_latency("0.5") == 0.5
+    assert parse_latency("") == 1.0
+
+
+def test_vectors_round_trip_as_float32():
+    vectors = [[0.25, -1.5, 3.0], [0.0, 1.0, 2.0]]
+    assert decode_vectors(encode_vectors(vectors)) == vectors
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "c.jsonl"), "rewrite")
+
+
+@pytest.mark.parametrize("name", ["cassette.jsonl", "nested/cassette.jsonl.gz"])
+def test_recorded_calls_replay_in_order(tmp_path, name):
+    path = str(tmp_path / name)
+    recorder = Cassette(path, "record")
+    request = {"messages": [{"role": "user", "content": "hi"}], "params": {"model": "gpt-3.5-turbo"}}
+    recorder.record("chat", request, {"answer": 1}, latency=0.2)
+    recorder.record("chat", request, {"answer": 2}, latency=0.4)
+    recorder.record_many("embedding", [({"text": "a"}, "va"), ({"text": "b"}, "vb")], latency=0.1)
+    assert recorder.stats()["recorded"] == 4
+
+    player = Cassette(path, "replay", latency_scale=0.5)
+    assert player.replay("chat", request) == ({"answer": 1}, 0.1)
+    assert player.replay("chat", request) == ({"answer": 2}, 0.2)
+    # The last recording repeats once the others are used up
+    assert player.replay("chat", request) == ({"answer": 2}, 0.2)
+    assert player.replay("embedding", {"text": "b"}) == ("vb", 0.05)
+
+    player.rewind()
+    assert player.replay("chat", request)[0] == {"answer": 1}
+
+    with pytest.raises(CassetteMiss):
+        player.replay("chat", dict(request, params={"model": "gpt-4"}))
+    assert (player.stats()["replayed"], player.stats()["misses"]) == (5, 1)
+
+
+def test_keys_ignore_dict_order():
+    assert Cassette.make_key("chat", {"a": 1, "b": 2}) == Cassette.make_key("chat", {"b": 2, "a": 1})
+    assert Cassette.make_key("chat", {"a": 1}) != Cassette.make_key("embedding", {"a": 1})
+
+
+def test_chat_model_replays_without_calling_upstream(tmp_path, monkeypatch):
+    pytest.importorskip("langchain")
+    from langchain.chat_models import ChatOpenAI
+    from langchain.schema import AIMessage, ChatGeneration, ChatResult, HumanMessage
+
+    import src.agents.cassette_llm as cassette_llm
+
+    upstream = []
+
+    def generate(self, messages, stop=None, run_manager=None, **kwargs):
+        upstream.append(messages)
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content="recorded answer"),
+                                        generation_info={"finish_reason": "stop"})],
+            llm_output={"token_usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}}
+        )
+
+    monkeypatch.setattr(ChatOpenAI, "_generate", generate)
+    path = str(tmp_path / "cassette.jsonl")
+    llm = cassette_llm.CassetteChatOpenAI(api_key="sk-test", temperature=0)
+    messages = [HumanMessage(content="hello")]
+
+    monkeypatch.setattr(cassette_llm, "llm_cassette", Cassette(path, "record"))
+    recorded = llm._generate(messages)
+
+    monkeypatch.setattr(cassette_llm, "llm_cassette", Cassette(path, "replay", latency_scale=0))
+    replayed = llm._generate(messages)
+    assert len(upstream) == 1
+    assert replayed.generations[0].text == recorded.generations[0].text == "recorded answer"
+    assert replayed.llm_output["token_usage"]["total_tokens"] == 5
+
+    with pytest.raises(CassetteMiss):
+        llm._generate([HumanMessage(content="something else")])
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from src.core.embedding_batcher import EmbeddingBatcher
+
+
+def test_concurrent_requests_share_one_batch():
+    calls = []
+
+    async def embed(texts):
+        calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    async def scenario():
+        batcher = EmbeddingBatcher(embed, max_batch_size=8, max_wait=0.01)
+        return await asyncio.gather(batcher.embed(["a"]), batcher.embed(["bb", "ccc"]))
+
+    assert asyncio.run(scenario()) == [[[1.0]], [[2.0], [3.0]]]
+    assert calls == [["a", "bb", "ccc"]]
+
+
+def test_errors_reach_every_caller():
+    async def embed(texts):
+        raise ValueError("upstream down")
+
+    async def scenario():
+        batcher = EmbeddingBatcher(embed, max_wait=0.01)
+        return await asyncio.gather(batcher.embed(["a"]), batcher.embed(["b"]), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_flush_cancels_its_callers():
+    async def scenario():
+        flushing = asyncio.Event()
+
+        async def embed(texts):
+            flushing.set()
+            await asyncio.sleep(10)
+
+        batcher = EmbeddingBatcher(embed, max_wait=0)
+        callers = [asyncio.ensure_future(batcher.embed([text])) for text in "ab"]
+        await flushing.wait()
+        for task in list(batcher._in_flight):
+            task.cancel()
+        done, pending = await asyncio.wait(callers, timeout=1)
+        return done, pending
+
+    done, pending = asyncio.run(scenario())
+    assert not pending
+    assert all(task.cancelled() for task in done)
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from src.core.request_coalescer import RequestCoalescer, parse_fields
+
+
+def test_parse_fields():
+    assert parse_fields(" verbose, apiKeys.serpapi ,,") == ["verbose", "apiKeys.serpapi"]
+    assert parse_fields(None) == []
+
+
+def test_key_ignores_excluded_fields_and_request_only_keys():
+    coalescer = RequestCoalescer(parse_fields("verbose,apiKeys.serpapi"))
+    key = coalescer.make_key("babyagi", "plan", {"apiKeys": {"openai": "sk-a"}})
+    assert key == coalescer.make_key("babyagi", "plan", {
+        "verbose": True, "profile": True, "coalesce": True, "apiKeys": {"openai": "sk-a", "serpapi": "x"}
+    })
+    assert key != coalescer.make_key("babyagi", "plan", {"apiKeys": {"openai": "sk-b"}})
+    assert key != coalescer.make_key("babyagi", "other", {"apiKeys": {"openai": "sk-a"}})
+    assert key != coalescer.make_key("autogpt", "plan", {"apiKeys": {"openai": "sk-a"}})
+
+
+def test_key_covers_cache_settings():
+    coalescer = RequestCoalescer()
+    key = coalescer.make_key("babyagi", "plan", {})
+    assert key != coalescer.make_key("babyagi", "plan", {}, bypass_cache=True)
+    assert key != coalescer.make_key("babyagi", "plan", {"semantic_cache": True})
+    assert coalescer.make_key("babyagi", "plan", {"semantic_cache": True, "semantic_cache_threshold": 0.9}) != \
+        coalescer.make_key("babyagi", "plan", {"semantic_cache": True, "semantic_cache_threshold": 0.8})
+
+
+def run_concurrently(coalescer, requests, result=None, error=None):
+    """Start every ``(user_input, config, bypass_cache)`` request at once; return the results and run count."""
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        if error is not None:
+            raise error
+        return {"result": result, "run": len(runs)}
+
+    async def scenario():
+        return await asyncio.gather(*(
+            coalescer.run("babyagi", user_input, config, work, bypass_cache=bypass)
+            for user_input, config, bypass in requests
+        ), return_exceptions=True)
+
+    return asyncio.run(scenario()), len(runs)
+
+
+def test_identical_concurrent_requests_share_one_run():
+    coalescer = RequestCoalescer(["verbose"])
+    results, runs = run_concurrently(coalescer, [("plan", {}, False), ("plan", {"verbose": True}, False),
+                                                 ("plan", {}, False)], result="done")
+    assert runs == 1
+    assert all(result == results[0] for result in results)
+    assert coalescer.stats()["coalesced"] == 2
+    assert coalescer.stats()["in_flight"] == 0
+
+
+def test_bypass_requests_do_not_join_cached_ones():
+    coalescer = RequestCoalescer()
+    results, runs = run_concurrently(coalescer, [("plan", {}, False), ("plan", {}, True), ("plan", {}, True)])
+    assert runs == 2
+    assert coalescer.stats()["coalesced"] == 1
+
+
+def test_followers_receive_the_leaders_exception():
+    coalescer = RequestCoalescer()
+    results, runs = run_concurrently(coalescer, [("plan", {}, False)] * 3, error=ValueError("boom"))
+    assert runs == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_requests_after_completion_run_again():
+    coalescer = RequestCoalescer()
+    run_concurrently(coalescer, [("plan", {}, False)])
+    _, runs = run_concurrently(coalescer, [("plan", {}, False)])
+    assert runs == 1
+    assert coalescer.stats()["leaders"] == 2
+
+
+def test_cancelled_follower_leaves_the_leader_running():
+    coalescer = RequestCoalescer()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.ensure_future(coalescer.run("babyagi", "plan", {}, work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(coalescer.run("babyagi", "plan", {}, work))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(scenario()) == "done"
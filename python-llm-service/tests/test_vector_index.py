@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from src.core.vector_index import IndexNamespace, VectorIndex
+
+
+def vectors(count, dim=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dim))
+
+
+def texts(prefix, count):
+    return [f"{prefix}{i}" for i in range(count)]
+
+
+def best(index, namespace, vector):
+    return index.search(namespace, vector, 1)[0][0]
+
+
+def test_search_is_scoped_to_the_namespace():
+    index = VectorIndex()
+    data = vectors(6)
+    index.add("a", data[:3], texts("a", 3), [{"n": i} for i in range(3)])
+    index.add("b", data[3:], texts("b", 3))
+    assert best(index, "a", data[1]) == "a1"
+    assert best(index, "b", data[1]).startswith("b")
+    assert index.search("a", data[1], 1)[0][1] == {"n": 1}
+    assert index.search("missing", data[1]) == []
+
+
+def test_flushed_rows_survive_a_reload(tmp_path):
+    data = vectors(5)
+    index = VectorIndex(str(tmp_path))
+    index.add("a", data[:3], texts("a", 3))
+    index.add("b", data[3:], texts("b", 2))
+    index.drop_namespace("b")
+    index.flush()
+
+    reloaded = VectorIndex(str(tmp_path))
+    assert reloaded.namespace_size("a") == 3
+    assert reloaded.namespace_size("b") == 0
+    assert reloaded.stats()["dead_rows"] == 2
+    assert best(reloaded, "a", data[2]) == "a2"
+
+
+def test_unflushed_rows_are_dropped_after_an_unclean_stop(tmp_path):
+    data = vectors(8)
+    index = VectorIndex(str(tmp_path), flush_every=4)
+    index.add("a", data[:4], texts("old", 4))  # Reaches flush_every, so this batch is flushed
+    index.add("a", data[4:6], texts("lost", 2))  # Appended to the log but never flushed
+    del index
+
+    restarted = VectorIndex(str(tmp_path))
+    assert restarted.namespace_size("a") == 4
+    restarted.add("a", data[6:8], texts("new", 2))
+    restarted.flush()
+
+    reloaded = VectorIndex(str(tmp_path))
+    assert reloaded.namespace_size("a") == 6
+    # Rows appended after the restart keep their own records
+    assert best(reloaded, "a", data[7]) == "new1"
+    assert best(reloaded, "a", data[3]) == "old3"
+    assert "lost0" not in {text for text, _, _ in reloaded.search("a", data[4], 6)}
+
+
+def test_dimension_mismatch_is_rejected():
+    index = VectorIndex()
+    index.add("a", vectors(1, dim=4), ["x"])
+    with pytest.raises(ValueError):
+        index.add("a", vectors(1, dim=8), ["y"])
+
+
+def test_namespace_calls_run_off_the_event_loop_thread():
+    data = vectors(3)
+    lookup = {text: vector for text, vector in zip(texts("t", 3), data)}
+    threads = set()
+
+    class RecordingIndex(VectorIndex):
+        def add(self, *args, **kwargs):
+            threads.add(threading.get_ident())
+            return super().add(*args, **kwargs)
+
+    async def embed(batch):
+        return [lookup[text] for text in batch]
+
+    async def scenario():
+        namespace = IndexNamespace(RecordingIndex(), "ns", embed)
+        await namespace.aadd_texts(texts("t", 3))
+        hits = await namespace.asimilarity_search("t2", 1)
+        await namespace.adrop()
+        return threading.get_ident(), hits, namespace.index.namespace_size("ns")
+
+    loop_thread, hits, size = asyncio.run(scenario())
+    assert threads and loop_thread not in threads
+    assert hits[0][0] == "t2"
+    assert size == 0